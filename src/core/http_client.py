@@ -0,0 +1,54 @@
+# src/core/http_client.py
+"""
+Cliente HTTP assíncrono compartilhado para chamadas a provedores LLM.
+Um único pool de conexões (keep-alive, HTTP/2 quando disponível) reaproveitado
+por todas as instâncias de serviço, evitando novo handshake TCP+TLS por request.
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - necessário apenas para habilitar HTTP/2 no httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    logger.debug("h2 não disponível, cliente LLM usando HTTP/1.1 com keep-alive")
+
+
+# Instância global do cliente
+_llm_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Obter cliente HTTP global para chamadas LLM (criado sob demanda)."""
+    global _llm_http_client
+    if _llm_http_client is None or _llm_http_client.is_closed:
+        # Com transport explícito, pool e HTTP/2 são configurados no próprio transport
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            # Apenas falhas de conexão; rate limit fica com o backoff dos serviços
+            retries=2
+        )
+        _llm_http_client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        logger.info(
+            f"✅ Cliente HTTP LLM compartilhado criado (HTTP/2: {HTTP2_AVAILABLE})"
+        )
+    return _llm_http_client
+
+
+async def close_llm_http_client() -> None:
+    """Fechar o cliente HTTP global (shutdown da aplicação)."""
+    global _llm_http_client
+    if _llm_http_client is not None and not _llm_http_client.is_closed:
+        await _llm_http_client.aclose()
+        logger.info("👋 Cliente HTTP LLM compartilhado fechado")
+    _llm_http_client = None
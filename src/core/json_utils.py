@@ -0,0 +1,71 @@
+# src/core/json_utils.py
+"""
+Utilitários JSON com aceleração opcional via orjson.
+Usa orjson quando instalado e cai para o json da stdlib caso contrário.
+"""
+
+import json
+import logging
+from typing import Any, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+    logger.debug("orjson não disponível, usando json da stdlib")
+
+# Exceção comum aos dois backends (orjson.JSONDecodeError herda de json.JSONDecodeError)
+JSONDecodeError = json.JSONDecodeError
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Decodificar JSON de str ou bytes.
+
+    Erros de parsing levantam JSONDecodeError em ambos os backends.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Serializar objeto para bytes JSON compactos (UTF-8).
+
+    Args:
+        obj: Objeto a serializar
+        sort_keys: Ordenar chaves (útil para chaves de cache determinísticas)
+
+    Returns:
+        bytes: JSON compacto
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(
+        obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def json_dumps_pretty(obj: Any, sort_keys: bool = False) -> str:
+    """
+    Serializar objeto para JSON indentado (2 espaços), para inclusão em prompts.
+
+    Args:
+        obj: Objeto a serializar
+        sort_keys: Ordenar chaves (forma canônica, estável entre chamadas)
+
+    Returns:
+        str: JSON indentado; caracteres não-ASCII mantidos literais nos dois backends
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option, default=str).decode("utf-8")
+    return json.dumps(
+        obj, indent=2, sort_keys=sort_keys, ensure_ascii=False, default=str
+    )
@@ -21,6 +21,7 @@ from typing import Dict, Any, Optional, List
 
 # Core imports - Database e configuração
 from src.core.database import init_database
+from src.core.http_client import close_llm_http_client
 from config.logger_config import setup_logging
 
 # =============================================================================
@@ -490,6 +491,7 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    await close_llm_http_client()
     await audit_logger.log_event("application_shutdown", uptime_info="graceful_shutdown")
     print("👋 IVO V2 finalizado graciosamente!")
 
@@ -9,7 +9,8 @@ import os
 import yaml
 import json
 import logging
-from typing import Dict, List, Any, Optional, Union
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 
@@ -17,6 +18,7 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 from src.core.enums import CEFRLevel, LanguageVariant, UnitType, TipStrategy, GrammarStrategy, AssessmentType
 from src.core.unit_models import VocabularyItem
+from src.core.json_utils import json_dumps_pretty
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +71,14 @@ class PromptGeneratorService:
         # Carregar todos os templates
         self._load_all_templates()
         
+        # Variáveis de unidade do prompt de gabarito já serializadas, por
+        # (unit_id, updated_at): gabaritos de vários assessments da mesma
+        # unidade não reserializam o conteúdo
+        self._gabarito_unit_variables: (
+            "OrderedDict[Tuple[Any, str], Dict[str, Any]]"
+        ) = OrderedDict()
+        self._max_gabarito_unit_variables = 32
+
         logger.info(f"✅ PromptGeneratorService inicializado com {len(self.templates)} templates e IA integrada")
     
     # =============================================================================
@@ -455,6 +465,60 @@ class PromptGeneratorService:
     # GABARITO GENERATION - GERAÇÃO DE GABARITOS
     # =============================================================================
     
+    def _get_gabarito_unit_variables(
+        self,
+        unit_data: Dict[str, Any],
+        hierarchy_context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Variáveis de unidade do prompt de gabarito (serializadas por versão)."""
+        cache_key = (
+            unit_data.get("id"), str(unit_data.get("updated_at", "")),
+            hierarchy_context.get("course_name", ""),
+            hierarchy_context.get("book_name", "")
+        )
+        # Sem id não há como distinguir unidades: não memoizar
+        unit_variables = None
+        if cache_key[0] is not None:
+            unit_variables = self._gabarito_unit_variables.get(cache_key)
+        if unit_variables is not None:
+            self._gabarito_unit_variables.move_to_end(cache_key)
+            return unit_variables
+
+        unit_variables = {
+            # Contexto da unidade
+            "course_name": hierarchy_context.get("course_name", ""),
+            "book_name": hierarchy_context.get("book_name", ""),
+            "unit_title": unit_data.get("title", ""),
+            "unit_id": unit_data.get("id", ""),
+            "cefr_level": unit_data.get("cefr_level", "A2"),
+            "unit_type": unit_data.get("unit_type", "lexical_unit"),
+            "unit_context": unit_data.get("context", ""),
+            "main_aim": unit_data.get("main_aim", ""),
+            "subsidiary_aims": json_dumps_pretty(unit_data.get("subsidiary_aims", [])),
+
+            # Dados de conteúdo da unidade para referência
+            "vocabulary_data": json_dumps_pretty(
+                unit_data.get("vocabulary", {}), sort_keys=True
+            ),
+            "sentences_data": json_dumps_pretty(
+                unit_data.get("sentences", {}), sort_keys=True
+            ),
+            "tips_data": json_dumps_pretty(
+                unit_data.get("tips", {}), sort_keys=True
+            ),
+            "grammar_data": json_dumps_pretty(
+                unit_data.get("grammar", {}), sort_keys=True
+            )
+        }
+
+        if cache_key[0] is None:
+            return unit_variables
+
+        self._gabarito_unit_variables[cache_key] = unit_variables
+        if len(self._gabarito_unit_variables) > self._max_gabarito_unit_variables:
+            self._gabarito_unit_variables.popitem(last=False)
+        return unit_variables
+
     async def generate_gabarito_prompt(
         self,
         unit_data: Dict[str, Any],
@@ -475,36 +539,20 @@ class PromptGeneratorService:
             List[Any]: Messages formatados para LangChain
         """
         
-        # Extrair dados estruturados da unidade
-        vocabulary_data = unit_data.get("vocabulary", {})
-        sentences_data = unit_data.get("sentences", {})
-        tips_data = unit_data.get("tips", {})
-        grammar_data = unit_data.get("grammar", {})
-        
-        # Preparar variáveis para o template YAML
+        # Preparar variáveis para o template YAML.
+        # O template coloca system prompt + contexto da unidade antes do
+        # assessment: o conteúdo da unidade é serializado de forma canônica
+        # (sort_keys) para que o prefixo do prompt seja idêntico entre gabaritos
+        # da mesma unidade e aproveite o prompt caching da OpenAI
         variables = {
-            # Contexto da unidade
-            "course_name": hierarchy_context.get("course_name", ""),
-            "book_name": hierarchy_context.get("book_name", ""),
-            "unit_title": unit_data.get("title", ""),
-            "unit_id": unit_data.get("id", ""),
-            "cefr_level": unit_data.get("cefr_level", "A2"),
-            "unit_type": unit_data.get("unit_type", "lexical_unit"),
-            "unit_context": unit_data.get("context", ""),
-            "main_aim": unit_data.get("main_aim", ""),
-            "subsidiary_aims": json.dumps(unit_data.get("subsidiary_aims", []), indent=2),
-            
-            # Dados de conteúdo da unidade para referência
-            "vocabulary_data": json.dumps(vocabulary_data, indent=2),
-            "sentences_data": json.dumps(sentences_data, indent=2),
-            "tips_data": json.dumps(tips_data, indent=2),
-            "grammar_data": json.dumps(grammar_data, indent=2),
+            # Contexto e conteúdo da unidade (memoizados por versão da unidade)
+            **self._get_gabarito_unit_variables(unit_data, hierarchy_context),
             
             # Dados específicos do assessment
             "assessment_type": assessment_type,
             "assessment_title": assessment_data.get("title", f"{assessment_type.replace('_', ' ').title()} Assessment"),
             "assessment_instructions": assessment_data.get("instructions", ""),
-            "assessment_content": json.dumps(assessment_data, indent=2)
+            "assessment_content": json_dumps_pretty(assessment_data)
         }
         
         # Verificar se template de gabarito existe
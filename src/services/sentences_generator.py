@@ -6,23 +6,700 @@ Atualizado para LangChain 0.3 e Pydantic 2 com sistema hierárquico Course → B
 """
 
 import asyncio
-import json
+import copy
 import logging
+import operator
+import re
 import time
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+from datetime import datetime, timezone
 import hashlib
+import heapq
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import cycle, islice
+from string import Template
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.utils.json import parse_partial_json
+from openai import RateLimitError
 from pydantic import BaseModel, ValidationError, Field, ConfigDict
 
 from src.core.unit_models import SentencesSection, Sentence, SentenceGenerationRequest
 from src.core.enums import CEFRLevel, LanguageVariant, UnitType
+from src.core.http_client import get_llm_http_client
+from src.core.json_utils import JSONDecodeError, json_loads, json_dumps_bytes
 from config.models import get_openai_config, load_model_configs
 
 logger = logging.getLogger(__name__)
 
+# Sons IPA que aumentam a complexidade fonética
+# (avaliados em ordem, com saída antecipada)
+COMPLEX_SOUNDS = ("θ", "ð", "ʃ", "ʒ", "ŋ", "ɹ", "æ", "ʌ", "ɜː", "ɪə", "eə")
+
+# Conjuntos constantes para checagens de pertinência nos loops de análise
+COLLOCATION_WORD_CLASSES = frozenset({"verb", "noun", "adjective"})
+VALID_COMPLEXITY_LEVELS = frozenset({"simple", "intermediate", "complex"})
+LOW_COMPLEXITY_LEVELS = frozenset({"simple", "intermediate"})
+
+# Bloco de código markdown (```json ... ``` ou ``` ... ```) em respostas do LLM
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|\Z)", re.DOTALL)
+
+# Extração por texto: linhas numeradas ("1. ...") e divisão por pontuação final
+_NUMBERED_LINE_RE = re.compile(r'^\d+\.\s*(.+)')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Padrões que facilitam conexões naturais em sentences
+CONNECTIVE_PATTERNS = {
+    "high_frequency_verbs": (
+        "be", "have", "do", "make", "take", "get", "go", "come", "see", "know"
+    ),
+    "common_prepositions": (
+        "in", "on", "at", "with", "for", "to", "from", "by", "about"
+    ),
+    "versatile_adjectives": (
+        "good", "bad", "big", "small", "new", "old", "important", "interesting"
+    ),
+    "temporal_adverbs": (
+        "now", "today", "yesterday", "tomorrow", "always", "never", "usually"
+    ),
+    "modal_auxiliaries": (
+        "can", "could", "will", "would", "should", "must", "may", "might"
+    ),
+}
+
+# Conectivos que indicam potencial de conexão entre vocabulários
+CONNECTIVE_WORDS = ("with", "for", "and", "or", "but", "because")
+
+# Campos semânticos comuns para clusters temáticos
+SEMANTIC_FIELDS = {
+    "hospitality": (
+        "hotel", "reservation", "room", "service", "guest", "reception", "check-in",
+        "booking"
+    ),
+    "business": (
+        "meeting", "presentation", "client", "company", "office", "manager", "project",
+        "deadline"
+    ),
+    "technology": (
+        "computer", "internet", "software", "digital", "online", "app", "device",
+        "system"
+    ),
+    "education": (
+        "student", "teacher", "school", "university", "study", "learn", "course", "exam"
+    ),
+    "food": ("restaurant", "meal", "menu", "order", "cook", "eat", "drink", "kitchen"),
+    "travel": (
+        "airport", "flight", "ticket", "luggage", "passport", "journey", "destination",
+        "trip"
+    ),
+    "health": (
+        "doctor", "hospital", "medicine", "treatment", "patient", "healthy", "illness",
+        "exercise"
+    ),
+    "shopping": (
+        "store", "price", "buy", "sell", "customer", "product", "payment", "discount"
+    ),
+}
+
+
+def _compile_substring_alternation(patterns) -> "re.Pattern[str]":
+    """Compilar padrões literais numa única alternação (mais longos primeiro)."""
+    ordered = sorted(set(patterns), key=len, reverse=True)
+    return re.compile("|".join(re.escape(p) for p in ordered))
+
+
+# Matchers pré-compilados: uma busca por palavra em vez de um `in` por padrão
+_CONNECTIVE_PATTERN_RE = _compile_substring_alternation(
+    pattern for patterns in CONNECTIVE_PATTERNS.values() for pattern in patterns
+)
+_CONNECTIVE_WORD_RE = _compile_substring_alternation(CONNECTIVE_WORDS)
+_SEMANTIC_FIELD_MATCHERS = tuple(
+    (field, _compile_substring_alternation(keywords), "\x00".join(keywords))
+    for field, keywords in SEMANTIC_FIELDS.items()
+)
+
+
+def _match_semantic_field(word: str) -> Optional[str]:
+    """Primeiro campo semântico cuja keyword contém a palavra ou está contida nela."""
+    for field, keyword_re, joined_keywords in _SEMANTIC_FIELD_MATCHERS:
+        # keyword contida na palavra (regex) ou palavra contida em alguma
+        # keyword (string unida)
+        if keyword_re.search(word) or word in joined_keywords:
+            return field
+    return None
+
+
+# Índice reverso keyword → campo
+# (resolvido pelo mesmo matcher, preservando a ordem dos campos)
+_KEYWORD_TO_FIELD = {
+    keyword: _match_semantic_field(keyword)
+    for keywords in SEMANTIC_FIELDS.values()
+    for keyword in keywords
+}
+
+# Tabela de remoção das marcas de stress IPA (primário ˈ e secundário ˌ)
+_STRESS_MARKS_DELETE_TABLE = str.maketrans("", "", "ˈˌ")
+
+
+def _count_stress_marks(phonemes: str) -> int:
+    """Contar marcas de stress primário e secundário numa passada (str.translate)."""
+    return len(phonemes) - len(phonemes.translate(_STRESS_MARKS_DELETE_TABLE))
+
+
+@lru_cache(maxsize=8192)
+def _phonetic_complexity(phoneme: str) -> str:
+    """Classificar complexidade fonética de um fonema IPA (memoizado por fonema)."""
+    if not phoneme:
+        return "simple"
+
+    # Remover delimitadores
+    clean_phoneme = phoneme.strip('/[]')
+
+    # Fatores de complexidade
+    stress_markers = _count_stress_marks(clean_phoneme)
+    if stress_markers >= 2:
+        return "complex"
+
+    # Contar sons complexos parando ao atingir o limiar de "complex"
+    sound_count = 0
+    for sound in COMPLEX_SOUNDS:
+        if sound in clean_phoneme:
+            sound_count += 1
+            if sound_count >= 3:
+                return "complex"
+
+    if sound_count >= 1 or stress_markers >= 1:
+        return "intermediate"
+    else:
+        return "simple"
+
+
+# Progressão de complexidade de sentences por nível CEFR
+SENTENCE_COMPLEXITY_PROGRESSION: Dict[str, Dict[str, Any]] = {
+    "A1": {
+        "start_complexity": "very_simple",
+        "end_complexity": "simple",
+        "progression_pattern": "Linear progression from 3-4 words to 6-8 words",
+        "sentence_types": ["simple_statements", "basic_questions"],
+        "max_clauses": 1
+    },
+    "A2": {
+        "start_complexity": "simple",
+        "end_complexity": "intermediate",
+        "progression_pattern": "Build from simple to compound sentences",
+        "sentence_types": ["compound_sentences", "basic_complex"],
+        "max_clauses": 2
+    },
+    "B1": {
+        "start_complexity": "intermediate",
+        "end_complexity": "complex",
+        "progression_pattern": "Introduce complex structures gradually",
+        "sentence_types": ["complex_sentences", "conditional_structures"],
+        "max_clauses": 3
+    },
+    "B2": {
+        "start_complexity": "complex",
+        "end_complexity": "sophisticated",
+        "progression_pattern": "Use varied complex structures",
+        "sentence_types": ["multi_clause", "embedded_structures"],
+        "max_clauses": 4
+    },
+    "C1": {
+        "start_complexity": "sophisticated",
+        "end_complexity": "advanced",
+        "progression_pattern": "Native-like structural variety",
+        "sentence_types": ["advanced_structures", "discourse_markers"],
+        "max_clauses": 5
+    },
+    "C2": {
+        "start_complexity": "advanced",
+        "end_complexity": "native_level",
+        "progression_pattern": "Natural complexity with stylistic variation",
+        "sentence_types": ["native_structures", "stylistic_variety"],
+        "max_clauses": 6
+    }
+}
+
+# Ajustes de complexidade por posição da sequência e por complexidade do vocabulário
+SEQUENCE_COMPLEXITY_ADJUSTMENTS = {
+    "early": "Keep slightly simpler for early units",
+    "late": "Allow more complexity for later units",
+    "standard": "Standard progression"
+}
+VOCABULARY_COMPLEXITY_ADJUSTMENTS = {
+    "complex": "Use simpler sentence structures to balance vocabulary complexity",
+    "simple": "Can use more complex sentence structures"
+}
+
+
+def _sequence_complexity_adjustment(sequence_order: int) -> str:
+    """Faixa de ajuste de complexidade para a posição da unidade na sequência."""
+    if sequence_order <= 3:
+        return "early"
+    if sequence_order >= 10:
+        return "late"
+    return "standard"
+
+
+@lru_cache(maxsize=128)
+def _sentence_complexity_guidance(
+    cefr_level: str, sequence_adjustment: str, vocabulary_complexity: str
+) -> Dict[str, Any]:
+    """Montar orientação de complexidade (memoizada; não mutar o dict retornado)."""
+    guidance = dict(
+        SENTENCE_COMPLEXITY_PROGRESSION.get(
+            cefr_level, SENTENCE_COMPLEXITY_PROGRESSION["A2"]
+        )
+    )
+    guidance["adjustment"] = SEQUENCE_COMPLEXITY_ADJUSTMENTS[sequence_adjustment]
+    guidance["vocabulary_adjustment"] = VOCABULARY_COMPLEXITY_ADJUSTMENTS.get(
+        vocabulary_complexity, "Balanced complexity"
+    )
+    return guidance
+
+
+# Separador entre componentes de chaves de cache (unit separator ASCII)
+CACHE_KEY_SEPARATOR = b"\x1f"
+
+@lru_cache(maxsize=1024)
+def _text_word_set(text: str) -> FrozenSet[str]:
+    """Palavras (minúsculas) de um texto; memoizado entre validadores."""
+    return frozenset(text.lower().split())
+
+
+@lru_cache(maxsize=256)
+def _context_keyword_pattern(unit_context: str) -> Optional["re.Pattern[str]"]:
+    """Alternação das palavras do contexto (substring em uma passada); None se vazio."""
+    keywords = _text_word_set(unit_context)
+    return _compile_substring_alternation(keywords) if keywords else None
+
+
+def _match_vocabulary(
+    text_lower: str, vocabulary_lookup: List[Tuple[str, str]]
+) -> List[str]:
+    """Palavras do vocabulário contidas no texto (minúsculo), em ordem."""
+    return [word for word, word_lower in vocabulary_lookup if word_lower in text_lower]
+
+
+# Sons destacados nas notas de pronúncia de cada sentence
+SENTENCE_DIFFICULT_SOUNDS = ("θ", "ð", "ŋ", "ʃ", "ʒ", "ɹ")
+
+# Sons monitorados nos padrões globais de pronúncia
+GLOBAL_VOWEL_SOUNDS = ("æ", "ʌ", "ɜː", "ɪ", "ʊ", "ə")
+GLOBAL_CONSONANT_SOUNDS = ("θ", "ð", "ʃ", "ʒ", "ŋ", "ɹ")
+
+# Tokens de palavra (inclui apóstrofo para contrações como "don't")
+_WORD_TOKEN_RE = re.compile(r"[a-z']+")
+
+# Grupos de palavras por foco gramatical, na ordem em que aparecem no resultado
+GRAMMATICAL_FOCUS_KEYWORDS = (
+    ("be_verb", frozenset({"is", "are", "was", "were", "am"})),
+    ("have_verb", frozenset({"have", "has", "had"})),
+    ("modal_verbs", frozenset({"will", "would", "can", "could", "should", "must"})),
+    ("articles", frozenset({"the", "a", "an"})),
+)
+
+# Frases indicativas de função comunicativa, em ordem de prioridade
+COMMUNICATIVE_FUNCTION_PHRASES = (
+    ("making_request", ("please", "could you", "would you", "can you")),
+    ("greeting", ("hello", "hi", "good morning", "good afternoon")),
+    ("social_formula", ("thank you", "thanks", "goodbye", "bye")),
+    ("expressing_opinion", ("think", "believe", "feel", "opinion")),
+)
+
+# Matchers de função comunicativa: uma alternação por função preserva a
+# prioridade entre funções
+_COMMUNICATIVE_FUNCTION_MATCHERS = tuple(
+    (function, _compile_substring_alternation(phrases))
+    for function, phrases in COMMUNICATIVE_FUNCTION_PHRASES
+)
+_QUESTION_WORD_RE = _compile_substring_alternation(
+    ("what", "where", "when", "why", "how", "who")
+)
+
+# Situações por contexto principal (ordem define prioridade)
+CONTEXT_SITUATION_MAPPINGS = {
+    "hotel": ("check_in", "reservation", "room_service", "reception"),
+    "restaurant": ("ordering", "menu_reading", "paying_bill", "reservation"),
+    "business": ("meeting", "presentation", "negotiation", "planning"),
+    "travel": ("airport", "transportation", "directions", "booking"),
+    "education": ("classroom", "studying", "examination", "discussion"),
+    "shopping": ("purchasing", "asking_prices", "comparing_products", "payment")
+}
+DEFAULT_CONTEXT_SITUATIONS = (
+    "general_conversation", "daily_interaction", "practical_situation", "social_context"
+)
+
+# Palavras de cada situação (split('_') feito uma vez) compiladas por contexto principal
+_CONTEXT_SITUATION_MATCHERS = {
+    main_context: tuple(
+        (situation, _compile_substring_alternation(situation.split("_")))
+        for situation in situations
+    )
+    for main_context, situations in CONTEXT_SITUATION_MAPPINGS.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _main_context_for(unit_context: str) -> Optional[str]:
+    """Primeiro contexto principal contido no contexto da unidade (memoizado)."""
+    unit_context_lower = unit_context.lower()
+    return next(
+        (main for main in CONTEXT_SITUATION_MAPPINGS if main in unit_context_lower),
+        None
+    )
+
+# Valores numéricos dos níveis de complexidade (progressão entre sentences)
+COMPLEXITY_NUMERIC_VALUES = {
+    "simple": 1,
+    "very_simple": 0.5,
+    "intermediate": 2,
+    "complex": 3,
+    "sophisticated": 4,
+    "advanced": 5
+}
+
+# Complexidades esperadas por nível na validação da progressão (mais tolerante em B2/C1)
+VALIDATION_EXPECTED_COMPLEXITIES = {
+    "A1": frozenset({"simple", "very_simple"}),
+    "A2": frozenset({"simple", "intermediate"}),
+    "B1": frozenset({"intermediate", "complex"}),
+    "B2": frozenset({"intermediate", "complex", "sophisticated"}),
+    "C1": frozenset({"complex", "sophisticated", "advanced"}),
+    "C2": frozenset({"sophisticated", "advanced"})
+}
+
+# Complexidades esperadas por nível no recálculo de adequação da progressão
+RECALCULATION_EXPECTED_COMPLEXITIES = {
+    "A1": frozenset({"simple", "very_simple"}),
+    "A2": frozenset({"simple", "intermediate"}),
+    "B1": frozenset({"intermediate", "complex"}),
+    "B2": frozenset({"intermediate", "complex"}),
+    "C1": frozenset({"complex", "sophisticated"}),
+    "C2": frozenset({"sophisticated", "advanced"})
+}
+DEFAULT_EXPECTED_COMPLEXITIES = frozenset({"intermediate"})
+
+# Adequação da progressão:
+# (última sequência da faixa, intervalos (mín, máx, veredito), veredito padrão)
+PROGRESSION_ADEQUACY_BANDS = (
+    (
+        2,
+        ((0.8, float("inf"), "excellent"), (0.6, float("inf"), "good")),
+        "needs_more_new_vocabulary"
+    ),
+    (5, ((0.4, 0.7, "excellent"), (0.3, 0.8, "good")), "needs_balance_adjustment"),
+    (
+        float("inf"),
+        ((float("-inf"), 0.4, "excellent"), (float("-inf"), 0.6, "good")),
+        "too_much_new_vocabulary"
+    )
+)
+
+# Bônus de qualidade por complexidade usado no ranking de _ensure_exact_target_count
+SENTENCE_QUALITY_COMPLEXITY_BONUS = {
+    "intermediate": 0.2,
+    "complex": 0.15
+}
+
+# Acima deste número de sentences a análise por sentence sai do event loop
+# (asyncio.to_thread)
+SENTENCE_ANALYSIS_OFFLOAD_THRESHOLD = 50
+
+# Campos fixos das sentences simples geradas para completar o target_count
+TARGET_COUNT_COMPLETION_SENTENCE = {
+    "complexity_level": "simple",
+    "pronunciation_notes": "",
+    "generated_method": "target_count_completion"
+}
+
+# Métricas da seção de sentences normalizadas para o intervalo [0.0, 1.0]
+SENTENCES_SCORE_FIELDS = (
+    "vocabulary_coverage", "contextual_coherence", "progression_appropriateness"
+)
+
+# Campos de nível de seção garantidos por _ensure_sentences_required_fields
+SENTENCES_SECTION_FIELDS = frozenset({
+    "sentences", "vocabulary_coverage", "contextual_coherence",
+    "progression_appropriateness", "phonetic_progression", "pronunciation_patterns"
+})
+
+# Layout de um registro de sentence: padrões escalares e campos de lista
+SENTENCE_SCALAR_DEFAULTS = {
+    "text": "Sample sentence using vocabulary.",
+    "context_situation": "general_context",
+    "complexity_level": "intermediate",
+    "pronunciation_notes": None
+}
+SENTENCE_LIST_FIELDS = (
+    "vocabulary_used", "reinforces_previous", "introduces_new", "phonetic_features"
+)
+
+# Schema simplificado para casos de token limit
+# (constante: não reconstruir a cada fallback)
+SIMPLE_SENTENCES_SCHEMA: Dict[str, Any] = {
+    "title": "SimpleSentencesSection",
+    "type": "object",
+    "properties": {
+        "sentences": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string"},
+                    "vocabulary_used": {"type": "array", "items": {"type": "string"}},
+                    "context_situation": {"type": "string"},
+                    "complexity_level": {
+                        "type": "string",
+                        "enum": ["simple", "intermediate", "complex"]
+                    }
+                },
+                "required": [
+                    "text", "vocabulary_used", "context_situation", "complexity_level"
+                ]
+            },
+            "minItems": 1,
+            "maxItems": 10
+        },
+        "vocabulary_coverage": {"type": "number", "minimum": 0.0, "maximum": 1.0}
+    },
+    "required": ["sentences", "vocabulary_coverage"]
+}
+
+# Guidelines de sentences por nível CEFR
+CEFR_SENTENCE_GUIDELINES = {
+    "A1": {
+        "structure": (
+            "Very simple sentences with basic present tense. "
+            "Use high-frequency vocabulary and short structures (4-8 words)."
+        ),
+        "connectors": "Use basic connectors: and, but, or",
+        "vocabulary": "Focus on concrete, everyday vocabulary",
+        "complexity": "One idea per sentence, simple SVO structure"
+    },
+    "A2": {
+        "structure": (
+            "Simple sentences with past and future tenses. "
+            "Include basic connectors like 'and', 'but', 'because'."
+        ),
+        "connectors": "Add: because, when, after, before",
+        "vocabulary": "Include some abstract concepts, basic adjectives",
+        "complexity": "Two clauses maximum, introduce compound sentences"
+    },
+    "B1": {
+        "structure": (
+            "More complex sentences with conditional and modal verbs. "
+            "Use varied sentence structures."
+        ),
+        "connectors": "Include: however, although, despite, in order to",
+        "vocabulary": "Professional and academic vocabulary, precise adjectives",
+        "complexity": "Complex sentences with dependent clauses"
+    },
+    "B2": {
+        "structure": (
+            "Complex and compound sentences with relative clauses. "
+            "Include sophisticated connectors."
+        ),
+        "connectors": "Advanced: nevertheless, furthermore, consequently, whereas",
+        "vocabulary": "Nuanced vocabulary, idiomatic expressions",
+        "complexity": "Multiple clauses, embedded structures"
+    },
+    "C1": {
+        "structure": (
+            "Advanced sentence structures with nuanced meanings. "
+            "Use sophisticated vocabulary and expressions."
+        ),
+        "connectors": "Sophisticated: notwithstanding, albeit, inasmuch as",
+        "vocabulary": "Precise, sophisticated, academic/professional register",
+        "complexity": "Complex syntax, subtle relationships between ideas"
+    },
+    "C2": {
+        "structure": (
+            "Native-level complexity with idiomatic expressions and advanced "
+            "grammatical structures."
+        ),
+        "connectors": "Native-level discourse markers and transitions",
+        "vocabulary": "Near-native lexical sophistication",
+        "complexity": "Natural complexity matching native speakers"
+    }
+}
+
+
+def _build_sentences_system_template(
+    cefr_level: str, cefr_guidance: Dict[str, str]
+) -> Template:
+    """Montar template do system prompt com as partes fixas do nível CEFR resolvidas."""
+
+    # Até B1 a linha de estrutura já cobre conectores, vocabulário e complexidade
+    if cefr_level in ["A1", "A2", "B1"]:
+        cefr_requirements = f"- Structure: {cefr_guidance['structure']}"
+    else:
+        cefr_requirements = (
+            f"- Structure: {cefr_guidance['structure']}\n"
+            f"- Connectors: {cefr_guidance['connectors']}\n"
+            f"- Vocabulary Level: {cefr_guidance['vocabulary']}\n"
+            f"- Complexity: {cefr_guidance['complexity']}"
+        )
+
+    return Template(f"""You are an expert English teacher creating contextual sentences for {cefr_level} level students using the IVO V2 pedagogical method.
+
+HIERARCHICAL CONTEXT:
+- Course: $course_name
+- Book: $book_name (Level: $target_level)
+- Unit: $unit_title (Sequence: $sequence_order)
+- Context: $unit_context
+- Language Variant: $language_variant
+- Unit Type: $unit_type
+
+VOCABULARY TO CONNECT ($total_words words):
+- Target Words: $target_words
+- Word Classes: $word_classes
+- High-Priority Words: $high_priority_words
+- Complexity Level: $complexity_level
+- Key Connectors: $key_connectors
+- $thematic_context
+
+RAG PROGRESSION CONTEXT:
+- Previously Taught ($taught_count): $taught_words
+- For Reinforcement: $reinforcement_words
+- Progression Strategy: $progression_strategy
+- Unit Position: #$sequence_order in $book_name
+
+CEFR {cefr_level} REQUIREMENTS:
+{cefr_requirements}
+
+SENTENCE GENERATION STRATEGY:
+$complexity_guidance
+
+IVO V2 PRINCIPLES:
+- Use every target word at least once, connecting it naturally with previously taught words
+- Progress from simple to more complex structures, varying length for {cefr_level}
+- Keep every sentence natural, communicative and related to "$unit_context"
+- Prefer authentic collocations and consider pronunciation patterns in sentence flow
+
+OUTPUT: JSON object with "sentences" (items: text, vocabulary_used, context_situation, complexity_level simple|intermediate|complex, reinforces_previous, introduces_new, phonetic_features, pronunciation_notes) and "vocabulary_coverage", "contextual_coherence", "progression_appropriateness" (0.0-1.0).""")
+
+
+# System prompts de sentences compilados uma vez por nível CEFR
+SENTENCES_SYSTEM_TEMPLATES = {
+    cefr_level: _build_sentences_system_template(cefr_level, cefr_guidance)
+    for cefr_level, cefr_guidance in CEFR_SENTENCE_GUIDELINES.items()
+}
+
+# Templates de fallback por nível CEFR (somente leitura)
+FALLBACK_SENTENCE_TEMPLATES = {
+    "A1": (
+        {
+            "pattern": "This is a {word1}.",
+            "complexity": "simple",
+            "function": "description"
+        },
+        {
+            "pattern": "I like {word1}.",
+            "complexity": "simple",
+            "function": "preference"
+        },
+        {
+            "pattern": "The {word1} is {word2}.",
+            "complexity": "simple",
+            "function": "description"
+        },
+        {
+            "pattern": "I have a {word1}.",
+            "complexity": "simple",
+            "function": "possession"
+        },
+        {
+            "pattern": "Where is the {word1}?",
+            "complexity": "simple",
+            "function": "asking_location"
+        }
+    ),
+    "A2": (
+        {
+            "pattern": "I would like to {word1} a {word2}.",
+            "complexity": "intermediate",
+            "function": "making_request"
+        },
+        {
+            "pattern": "The {word1} is very {word2}.",
+            "complexity": "intermediate",
+            "function": "description"
+        },
+        {
+            "pattern": "Can you help me with the {word1}?",
+            "complexity": "intermediate",
+            "function": "asking_help"
+        },
+        {
+            "pattern": "I need to {word1} before {word2}.",
+            "complexity": "intermediate",
+            "function": "expressing_necessity"
+        },
+        {
+            "pattern": "This {word1} looks {word2}.",
+            "complexity": "intermediate",
+            "function": "observation"
+        }
+    ),
+    "B1": (
+        {
+            "pattern": "I'm interested in {word1} because it's {word2}.",
+            "complexity": "complex",
+            "function": "expressing_interest"
+        },
+        {
+            "pattern": "Although the {word1} is {word2}, I still like it.",
+            "complexity": "complex",
+            "function": "contrasting"
+        },
+        {
+            "pattern": "If you {word1} the {word2}, it will be better.",
+            "complexity": "complex",
+            "function": "giving_advice"
+        },
+        {
+            "pattern": "The {word1} that we discussed is {word2}.",
+            "complexity": "complex",
+            "function": "referring"
+        },
+        {
+            "pattern": "I've been {word1} for this {word2} all week.",
+            "complexity": "complex",
+            "function": "describing_duration"
+        }
+    )
+}
+
+class _TemplateWords(dict):
+    """Placeholders dos templates de fallback; chaves ausentes recebem "good"."""
+
+    def __missing__(self, key: str) -> str:
+        return "good"
+
+
+# Template extra para contextos de hotel
+HOTEL_CONTEXT_TEMPLATE = {
+    "pattern": "I'd like to book a {word1} for {word2}.",
+    "complexity": "intermediate",
+    "function": "booking"
+}
+
+
+@lru_cache(maxsize=64)
+def _fallback_sentence_templates(
+    cefr_level: str, hotel_context: bool
+) -> Tuple[Dict[str, str], ...]:
+    """Templates de fallback para o nível (memoizados; não mutar os dicts)."""
+    base_templates = FALLBACK_SENTENCE_TEMPLATES.get(
+        cefr_level, FALLBACK_SENTENCE_TEMPLATES["A2"]
+    )
+    if hotel_context:
+        return base_templates + (HOTEL_CONTEXT_TEMPLATE,)
+    return base_templates
+
 
 class SentencesGenerationRequest(BaseModel):
     """Modelo de requisição para geração de sentences - Pydantic 2."""
@@ -37,9 +714,11 @@ class SentencesGenerationRequest(BaseModel):
     target_sentences: Optional[int] = Field(None, description="DEPRECATED: Use target_sentence_count")
     
     # Pydantic 2 - Nova sintaxe de configuração
+    # Request interno nunca é alterado após construção:
+    # frozen em vez de validate_assignment
     model_config = ConfigDict(
         str_strip_whitespace=True,
-        validate_assignment=True,
+        frozen=True,
         arbitrary_types_allowed=True,
         extra='allow'
     )
@@ -58,16 +737,88 @@ class SentencesGeneratorService:
         
         # Obter configuração específica para sentences_generator (TIER-2: gpt-5-mini)
         llm_config = get_llm_config_for_service("sentences_generator")
-        self.llm = ChatOpenAI(**llm_config)
+        # Pool de conexões compartilhado entre instâncias (serviço é criado por request)
+        self.llm = ChatOpenAI(**llm_config, http_async_client=get_llm_http_client())
+
+        # Variante em JSON mode para o fallback sem structured output
+        # (resposta sempre JSON válido)
+        self._json_mode_llm = self.llm.bind(response_format={"type": "json_object"})
+
+        # Wrapper structured output do schema simplificado criado uma única vez
+        self._structured_simple_llm = self.llm.with_structured_output(
+            SIMPLE_SENTENCES_SCHEMA
+        )
+
+        # Encoder de tokens para pré-checar o orçamento do prompt, carregado no
+        # primeiro uso (com cache frio o tiktoken baixa o BPE pela rede - não pode
+        # bloquear a construção)
+        self._token_model_name = llm_config.get("model", "gpt-4o-mini")
+        self._token_encoder: Optional[Any] = None
+        self._token_encoder_loaded = False
+        self._max_output_tokens = llm_config.get("max_tokens", 2048)
+        self._context_window_tokens = self.openai_config.get("context_window", 128000)
+
+        # Limite de chamadas LLM simultâneas de fallback
+        # (geração em lote compartilha a instância)
+        self._llm_semaphore = asyncio.Semaphore(8)
+        self._llm_rate_limit_retries = 3
         
         # Cache inteligente em memória
-        self._memory_cache: Dict[str, Any] = {}
+        # Ordem LRU: mais antigo primeiro
+        self._memory_cache: "OrderedDict[str, Any]" = OrderedDict()
         self._cache_expiry: Dict[str, float] = {}
+        # Min-heap (expiração, chave); entradas obsoletas são ignoradas
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._max_cache_size = 50
         self._cache_ttl = 3600  # 1 hora
         
+        # Sections geradas recentemente
+        # (saída antecipada para a mesma unidade/vocabulário)
+        self._recent_sections: Dict[str, Tuple[float, SentencesSection]] = {}
+        self._recent_sections_max_size = 64
+        self._recent_sections_ttl = 600  # 10 minutos
+
         logger.info("✅ SentencesGeneratorService inicializado com LangChain 0.3 e structured output")
     
+    def _load_token_encoder(self, model_name: str) -> Optional[Any]:
+        """Carregar encoder tiktoken do modelo (None se indisponível)."""
+        try:
+            # Dependência transitiva do langchain-openai; não declarada no pyproject
+            import tiktoken
+        except ImportError:
+            logger.debug("tiktoken não disponível, pré-checagem de tokens desativada")
+            return None
+
+        try:
+            try:
+                return tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                # Modelos recentes podem não estar mapeados: encoding da família gpt-4o
+                return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            # Sem rede/egress bloqueado (cache frio) ou cache corrompido:
+            # seguir sem a pré-checagem
+            logger.warning(
+                f"⚠️ Encoder tiktoken indisponível ({e}), "
+                f"pré-checagem de tokens desativada"
+            )
+            return None
+
+    async def _count_prompt_tokens(self, prompt_messages: List[Any]) -> Optional[int]:
+        """Contar tokens de entrada do prompt (None se encoder indisponível)."""
+        if not self._token_encoder_loaded:
+            # Carga única fora do event loop; falha não é repetida a cada request
+            self._token_encoder = await asyncio.to_thread(
+                self._load_token_encoder, self._token_model_name
+            )
+            self._token_encoder_loaded = True
+        if self._token_encoder is None:
+            return None
+        return sum(
+            len(self._token_encoder.encode(str(message.content)))
+            for message in prompt_messages
+        )
+
     async def generate_sentences_for_unit(
         self,
         sentences_request: SentenceGenerationRequest,
@@ -94,11 +845,30 @@ class SentencesGeneratorService:
         try:
             start_time = time.time()
             
+            # model_construct não valida tipos - garantir o mínimo aqui
+            if not isinstance(unit_data, dict) or not isinstance(vocabulary_data, dict):
+                raise ValueError("unit_data e vocabulary_data devem ser dicionários")
+
             # Usar target_count do request
             target_count = sentences_request.target_count if sentences_request.target_count else 8
             
             logger.info(f"📝 Gerando {target_count} sentences para unidade {unit_data.get('title', 'Unknown')}")
             
+            # Saída antecipada: mesma combinação (book, CEFR, contexto, target,
+            # vocabulário) gerada há pouco
+            section_key = self._generate_recent_section_key(
+                unit_data, vocabulary_data, hierarchy_context, target_count
+            )
+            recent_section = self._get_recent_section(section_key)
+            if recent_section is not None:
+                logger.info(
+                    "📦 Reutilizando sentences geradas recentemente "
+                    "para o mesmo vocabulário"
+                )
+                return recent_section.model_copy(
+                    deep=True, update={"generated_at": datetime.now(timezone.utc)}
+                )
+
             # Criar objeto request interno para compatibilidade com funções auxiliares
             request_data = {
                 "unit_data": unit_data,
@@ -108,7 +878,9 @@ class SentencesGeneratorService:
                 "images_context": images_context,
                 "target_sentence_count": target_count
             }
-            request = SentencesGenerationRequest(**request_data)
+            # Dados já validados pelo SentenceGenerationRequest externo:
+            # evitar revalidação Pydantic
+            request = SentencesGenerationRequest.model_construct(**request_data)
             
             # 1. Analisar vocabulário disponível
             vocabulary_analysis = await self._analyze_vocabulary_for_sentences(request)
@@ -144,6 +916,8 @@ class SentencesGeneratorService:
             )
             
             # 8. Construir SentencesSection final
+            # (uma única leitura do relógio para stamp e duração)
+            end_time = time.time()
             sentences_section = SentencesSection(
                 sentences=validated_sentences["sentences"],
                 vocabulary_coverage=validated_sentences["vocabulary_coverage"],
@@ -151,10 +925,12 @@ class SentencesGeneratorService:
                 progression_appropriateness=validated_sentences["progression_appropriateness"],
                 phonetic_progression=validated_sentences.get("phonetic_progression", []),
                 pronunciation_patterns=validated_sentences.get("pronunciation_patterns", []),
-                generated_at=datetime.now()
+                generated_at=datetime.fromtimestamp(end_time, tz=timezone.utc)
             )
             
-            generation_time = time.time() - start_time
+            generation_time = end_time - start_time
+
+            self._save_recent_section(section_key, sentences_section)
             
             logger.info(
                 f"✅ Sentences geradas: {len(sentences_section.sentences)} em {generation_time:.2f}s"
@@ -168,7 +944,46 @@ class SentencesGeneratorService:
         except Exception as e:
             logger.error(f"❌ Erro na geração de sentences: {str(e)}")
             raise
-    
+
+    async def generate_sentences_for_units(
+        self,
+        units_requests: List[Tuple[Any, ...]],
+        max_concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Gerar sentences para múltiplas unidades concorrentemente (ex: book completo).
+
+        Args:
+            units_requests: Tuplas com os argumentos de generate_sentences_for_unit
+            max_concurrency: Máximo de chamadas LLM simultâneas
+
+        Returns:
+            Lista na mesma ordem da entrada com SentencesSection ou a exceção da unidade
+        """
+        # Respeitar limite de requests por minuto da OpenAI se configurado
+        rpm_limit = self.openai_config.get("rpm_limit")
+        if rpm_limit:
+            max_concurrency = min(max_concurrency, int(rpm_limit))
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def bounded_generation(unit_args: Tuple[Any, ...]) -> SentencesSection:
+            async with semaphore:
+                return await self.generate_sentences_for_unit(*unit_args)
+
+        results = await asyncio.gather(
+            *[bounded_generation(unit_args) for unit_args in units_requests],
+            return_exceptions=True
+        )
+
+        failed = sum(1 for result in results if isinstance(result, Exception))
+        logger.info(
+            f"📊 Geração em lote concluída: {len(results) - failed}/{len(results)} "
+            f"unidades com sucesso"
+        )
+
+        return results
+
     async def _analyze_vocabulary_for_sentences(self, request: SentencesGenerationRequest) -> Dict[str, Any]:
         """Analisar vocabulário para geração de sentences otimizada."""
         
@@ -177,37 +992,31 @@ class SentencesGeneratorService:
         if not vocabulary_items:
             raise ValueError("Vocabulário vazio - não é possível gerar sentences")
         
-        # Análise detalhada do vocabulário
-        word_classes = {}
-        frequency_levels = {}
-        syllable_counts = []
-        vocabulary_words = []
-        phonetic_complexity = {}
-        collocations_potential = []
+        # Converter itens (lista de dicts) em colunas paralelas numa única passada
+        columns = self._extract_vocabulary_columns(vocabulary_items)
+        vocabulary_words = columns["words"]
         
-        for item in vocabulary_items:
-            word = item.get("word", "")
-            word_class = item.get("word_class", "unknown")
-            frequency = item.get("frequency_level", "medium")
-            syllables = item.get("syllable_count", 1)
-            phoneme = item.get("phoneme", "")
-            context_relevance = item.get("context_relevance", 0.5)
-            
-            vocabulary_words.append(word)
-            word_classes[word_class] = word_classes.get(word_class, 0) + 1
-            frequency_levels[frequency] = frequency_levels.get(frequency, 0) + 1
-            syllable_counts.append(syllables)
-            
-            # Análise fonética
-            if phoneme:
-                complexity = self._calculate_phonetic_complexity(phoneme)
-                phonetic_complexity[word] = complexity
-            
-            # Identificar potencial de colocações
-            if word_class in ["verb", "noun", "adjective"] and context_relevance > 0.7:
-                collocations_potential.append(word)
+        # Análise detalhada do vocabulário sobre as colunas
+        word_classes = dict(Counter(columns["word_classes"]))
+        frequency_levels = dict(Counter(columns["frequency_levels"]))
+
+        phonetic_complexity = {
+            word: self._calculate_phonetic_complexity(phoneme)
+            for word, phoneme in zip(vocabulary_words, columns["phonemes"])
+            if phoneme
+        }
+
+        # Identificar potencial de colocações
+        collocations_potential = [
+            word
+            for word, word_class, relevance in zip(
+                vocabulary_words, columns["word_classes"], columns["relevances"]
+            )
+            if word_class in COLLOCATION_WORD_CLASSES and relevance > 0.7
+        ]
         
         # Determinar complexidade média e padrões
+        syllable_counts = columns["syllables"]
         avg_syllables = sum(syllable_counts) / len(syllable_counts) if syllable_counts else 1
         complexity_level = self._determine_sentences_complexity_level(avg_syllables, word_classes, phonetic_complexity)
         
@@ -225,13 +1034,53 @@ class SentencesGeneratorService:
             "complexity_level": complexity_level,
             "avg_syllables": avg_syllables,
             "key_connective_words": key_words,
-            "phonetic_items": [item for item in vocabulary_items if item.get("phoneme")],
+            "phonetic_items": [
+                item
+                for item, phoneme in zip(vocabulary_items, columns["phonemes"])
+                if phoneme
+            ],
             "phonetic_complexity": phonetic_complexity,
             "collocations_potential": collocations_potential,
             "thematic_clusters": thematic_clusters,
-            "high_relevance_words": [item.get("word") for item in vocabulary_items if item.get("context_relevance", 0) > 0.8]
+            "high_relevance_words": [
+                word
+                for word, relevance in zip(vocabulary_words, columns["relevances"])
+                if relevance > 0.8
+            ],
+            "vocabulary_columns": columns,
+            # Pares (palavra, minúscula) para matching por sentence sem repetir .lower()
+            "vocabulary_lookup": [(word, word.lower()) for word in vocabulary_words],
+            # Idem para o vocabulário já ensinado (detecção de reforço por sentence)
+            "taught_lookup": [
+                (word, word.lower())
+                for word in request.rag_context.get("taught_vocabulary", [])
+            ]
         }
     
+    def _extract_vocabulary_columns(
+        self, vocabulary_items: List[Dict[str, Any]]
+    ) -> Dict[str, List[Any]]:
+        """Extrair campos do vocabulário em listas paralelas (um acesso por item)."""
+
+        columns: Dict[str, List[Any]] = {
+            "words": [],
+            "word_classes": [],
+            "frequency_levels": [],
+            "syllables": [],
+            "phonemes": [],
+            "relevances": []
+        }
+
+        for item in vocabulary_items:
+            columns["words"].append(item.get("word", ""))
+            columns["word_classes"].append(item.get("word_class", "unknown"))
+            columns["frequency_levels"].append(item.get("frequency_level", "medium"))
+            columns["syllables"].append(item.get("syllable_count", 1))
+            columns["phonemes"].append(item.get("phoneme", ""))
+            columns["relevances"].append(item.get("context_relevance", 0.5))
+
+        return columns
+
     async def _build_hierarchical_progression_context(
         self, 
         request: SentencesGenerationRequest, 
@@ -306,48 +1155,7 @@ class SentencesGeneratorService:
         complexity_level = vocabulary_analysis["complexity_level"]
         hierarchy = progression_context["hierarchy"]
         
-        # Guidelines específicos por nível CEFR (expandidos)
-        cefr_guidelines = {
-            "A1": {
-                "structure": "Very simple sentences with basic present tense. Use high-frequency vocabulary and short structures (4-8 words).",
-                "connectors": "Use basic connectors: and, but, or",
-                "vocabulary": "Focus on concrete, everyday vocabulary",
-                "complexity": "One idea per sentence, simple SVO structure"
-            },
-            "A2": {
-                "structure": "Simple sentences with past and future tenses. Include basic connectors like 'and', 'but', 'because'.",
-                "connectors": "Add: because, when, after, before",
-                "vocabulary": "Include some abstract concepts, basic adjectives",
-                "complexity": "Two clauses maximum, introduce compound sentences"
-            },
-            "B1": {
-                "structure": "More complex sentences with conditional and modal verbs. Use varied sentence structures.",
-                "connectors": "Include: however, although, despite, in order to",
-                "vocabulary": "Professional and academic vocabulary, precise adjectives",
-                "complexity": "Complex sentences with dependent clauses"
-            },
-            "B2": {
-                "structure": "Complex and compound sentences with relative clauses. Include sophisticated connectors.",
-                "connectors": "Advanced: nevertheless, furthermore, consequently, whereas",
-                "vocabulary": "Nuanced vocabulary, idiomatic expressions",
-                "complexity": "Multiple clauses, embedded structures"
-            },
-            "C1": {
-                "structure": "Advanced sentence structures with nuanced meanings. Use sophisticated vocabulary and expressions.",
-                "connectors": "Sophisticated: notwithstanding, albeit, inasmuch as",
-                "vocabulary": "Precise, sophisticated, academic/professional register",
-                "complexity": "Complex syntax, subtle relationships between ideas"
-            },
-            "C2": {
-                "structure": "Native-level complexity with idiomatic expressions and advanced grammatical structures.",
-                "connectors": "Native-level discourse markers and transitions",
-                "vocabulary": "Near-native lexical sophistication",
-                "complexity": "Natural complexity matching native speakers"
-            }
-        }
-        
         cefr_level = unit_data.get("cefr_level", "A2")
-        cefr_guidance = cefr_guidelines.get(cefr_level, cefr_guidelines["A2"])
         
         # Contextualização temática
         thematic_context = ""
@@ -355,79 +1163,34 @@ class SentencesGeneratorService:
             clusters = list(vocabulary_analysis["thematic_clusters"].keys())[:3]
             thematic_context = f"Main themes to connect: {', '.join(clusters)}"
         
-        system_prompt = f"""You are an expert English teacher creating contextual sentences for {cefr_level} level students using the IVO V2 pedagogical method.
-
-HIERARCHICAL CONTEXT:
-- Course: {hierarchy['course_name']}
-- Book: {hierarchy['book_name']} (Level: {hierarchy['target_level']})
-- Unit: {unit_data.get('title', '')} (Sequence: {hierarchy['sequence_order']})
-- Context: {unit_data.get('context', '')}
-- Language Variant: {unit_data.get('language_variant', 'american_english')}
-- Unit Type: {unit_data.get('unit_type', 'lexical_unit')}
-
-VOCABULARY TO CONNECT ({vocabulary_analysis['total_words']} words):
-- Target Words: {', '.join(vocabulary_words[:20])}
-- Word Classes: {dict(list(vocabulary_analysis['word_classes'].items())[:6])}
-- High-Priority Words: {', '.join(vocabulary_analysis['high_relevance_words'][:10])}
-- Complexity Level: {complexity_level}
-- Key Connectors: {', '.join(vocabulary_analysis['key_connective_words'])}
-- {thematic_context}
-
-RAG PROGRESSION CONTEXT:
-- Previously Taught ({len(progression_context['taught_vocabulary'])}): {', '.join(progression_context['taught_vocabulary'])}
-- For Reinforcement: {', '.join(progression_context['reinforcement_words'])}
-- Progression Strategy: {progression_context['progression_strategy']}
-- Unit Position: #{hierarchy['sequence_order']} in {hierarchy['book_name']}
-
-CEFR {cefr_level} REQUIREMENTS:
-- Structure: {cefr_guidance['structure']}
-- Connectors: {cefr_guidance['connectors']}
-- Vocabulary Level: {cefr_guidance['vocabulary']}
-- Complexity: {cefr_guidance['complexity']}
-
-SENTENCE GENERATION STRATEGY:
-{progression_context['sentence_complexity_guidance']}
-
-IVO V2 PEDAGOGICAL PRINCIPLES:
-1. VOCABULARY INTEGRATION: Use each target word at least once, some words multiple times
-2. PROGRESSIVE COMPLEXITY: Start simple, gradually increase structural complexity
-3. CONTEXTUAL COHERENCE: All sentences should relate to "{unit_data.get('context', '')}"
-4. CONNECTIVITY: Connect new vocabulary with previously taught words naturally
-5. COMMUNICATIVE PURPOSE: Sentences should demonstrate real, meaningful usage
-6. HIERARCHICAL REINFORCEMENT: Build on vocabulary from previous units
-7. PHONETIC AWARENESS: Consider pronunciation patterns in sentence flow
-
-NATURAL LANGUAGE PRINCIPLES:
-- Use authentic collocations and word combinations
-- Ensure sentences sound natural to native speakers
-- Vary sentence length appropriately for {cefr_level} level
-- Create meaningful, contextually relevant examples
-- Show how words work together in real communication
-
-OUTPUT FORMAT - Return exactly this JSON structure:
-{{
-  "sentences": [
-    {{
-      "text": "Natural sentence using vocabulary contextually and meaningfully.",
-      "vocabulary_used": ["word1", "word2"],
-      "context_situation": "specific_context_description",
-      "complexity_level": "simple|intermediate|complex",
-      "reinforces_previous": ["known_word1"],
-      "introduces_new": ["new_word1"],
-      "phonetic_features": ["stress_pattern", "linking_sounds"],
-      "pronunciation_notes": "Optional pronunciation guidance for this sentence",
-      "communicative_function": "greeting|information|request|description",
-      "sentence_length": 8,
-      "grammatical_focus": ["present_simple", "article_usage"]
-    }}
-  ],
-  "vocabulary_coverage": 0.95,
-  "contextual_coherence": 0.90,
-  "progression_appropriateness": 0.88,
-  "thematic_consistency": 0.92
-}}
-
-CRITICAL: Every sentence must sound natural and be contextually meaningful within "{unit_data.get('context', '')}"."""
+        # Template pré-compilado por nível CEFR: só campos dinâmicos são substituídos
+        system_template = SENTENCES_SYSTEM_TEMPLATES.get(
+            cefr_level, SENTENCES_SYSTEM_TEMPLATES["A2"]
+        )
+        system_prompt = system_template.substitute(
+            course_name=hierarchy['course_name'],
+            book_name=hierarchy['book_name'],
+            target_level=hierarchy['target_level'],
+            unit_title=unit_data.get('title', ''),
+            sequence_order=hierarchy['sequence_order'],
+            unit_context=unit_data.get('context', ''),
+            language_variant=unit_data.get('language_variant', 'american_english'),
+            unit_type=unit_data.get('unit_type', 'lexical_unit'),
+            total_words=vocabulary_analysis['total_words'],
+            target_words=', '.join(vocabulary_words[:20]),
+            word_classes=dict(list(vocabulary_analysis['word_classes'].items())[:6]),
+            high_priority_words=', '.join(
+                vocabulary_analysis['high_relevance_words'][:10]
+            ),
+            complexity_level=complexity_level,
+            key_connectors=', '.join(vocabulary_analysis['key_connective_words']),
+            thematic_context=thematic_context,
+            taught_count=len(progression_context['taught_vocabulary']),
+            taught_words=', '.join(progression_context['taught_vocabulary']),
+            reinforcement_words=', '.join(progression_context['reinforcement_words']),
+            progression_strategy=progression_context['progression_strategy'],
+            complexity_guidance=progression_context['sentence_complexity_guidance']
+        )
 
         target_count = request.target_sentence_count or request.target_sentences
         human_prompt = f"""MANDATORY: Generate EXACTLY {target_count} sentences - NO MORE, NO LESS.
@@ -573,23 +1336,45 @@ Generate the complete JSON structure with all {target_count} sentences now:"""
                 logger.info("📦 Usando resultado do cache inteligente")
                 return cached_result
             
+            # Evitar round-trip fadado a falhar por limite de tokens
+            prompt_tokens = await self._count_prompt_tokens(prompt_messages)
+            prompt_budget = self._context_window_tokens - self._max_output_tokens
+            if prompt_tokens is not None and prompt_tokens > prompt_budget:
+                logger.warning(
+                    f"⚠️ Prompt com {prompt_tokens} tokens excede o orçamento, "
+                    f"usando prompt reduzido"
+                )
+                return await self._generate_sentences_with_reduced_prompt(request)
+
             # Usar LangChain 0.3 with_structured_output para forçar formato correto
             sentences_schema = self._create_sentences_schema()
             structured_llm = self.llm.with_structured_output(sentences_schema)
             
-            # Gerar usando structured output
-            sentences_data = await structured_llm.ainvoke(prompt_messages)
+            # Gerar via streaming, limpando cada sentence assim que ela fica completa
+            sentences_data = None
+            cleaned_sentences: List[Dict[str, Any]] = []
+            next_index = 0
+
+            async for chunk in structured_llm.astream(prompt_messages):
+                sentences_data = chunk
+                next_index = self._clean_completed_sentences(
+                    chunk, cleaned_sentences, next_index
+                )
             
             # Validar que retornou dict
             if not isinstance(sentences_data, dict):
                 logger.warning("⚠️ Structured output não retornou dict, convertendo...")
                 sentences_data = dict(sentences_data) if hasattr(sentences_data, '__dict__') else {}
+                cleaned_sentences, next_index = [], 0
             
             # Garantir campos obrigatórios com fallbacks seguros
             sentences_data = self._ensure_sentences_required_fields(sentences_data)
             
-            # Validar estrutura de cada sentence
-            sentences_data = self._clean_sentences_data(sentences_data)
+            # Validar estrutura das sentences restantes
+            # (as já limpas durante o stream são reaproveitadas)
+            sentences_data = self._clean_sentences_data(
+                sentences_data, cleaned_sentences, next_index
+            )
             
             # Salvar no cache com TTL
             self._save_to_cache_with_ttl(cache_key, sentences_data)
@@ -637,9 +1422,7 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             
             # Usar structured output com schema simples
             simple_schema = self._create_simple_sentences_schema()
-            structured_llm = self.llm.with_structured_output(simple_schema)
-            
-            sentences_data = await structured_llm.ainvoke(messages)
+            sentences_data = await self._cached_llm_call(messages, simple_schema)
             
             # Garantir estrutura mínima
             if not isinstance(sentences_data, dict):
@@ -657,43 +1440,25 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
 
     def _create_simple_sentences_schema(self) -> Dict[str, Any]:
         """Schema simplificado para casos de token limit."""
-        return {
-            "title": "SimpleSentencesSection",
-            "type": "object",
-            "properties": {
-                "sentences": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "text": {"type": "string"},
-                            "vocabulary_used": {"type": "array", "items": {"type": "string"}},
-                            "context_situation": {"type": "string"},
-                            "complexity_level": {"type": "string", "enum": ["simple", "intermediate", "complex"]}
-                        },
-                        "required": ["text", "vocabulary_used", "context_situation", "complexity_level"]
-                    },
-                    "minItems": 1,
-                    "maxItems": 10
-                },
-                "vocabulary_coverage": {"type": "number", "minimum": 0.0, "maximum": 1.0}
-            },
-            "required": ["sentences", "vocabulary_coverage"]
-        }
+        return SIMPLE_SENTENCES_SCHEMA
 
     def _generate_emergency_sentences(self, request: SentencesGenerationRequest) -> Dict[str, Any]:
         """Fallback de emergência quando tudo falha."""
         vocabulary_words = [item.get("word", f"word{i}") for i, item in enumerate(request.vocabulary_data.get("items", [])[:5])]
         context = request.unit_data.get("context", "general English")
         
-        emergency_sentences = []
-        for i, word in enumerate(vocabulary_words[:5]):
-            emergency_sentences.append({
-                "text": f"This example shows how to use {word} in {context}.",
+        # Parte fixa do template resolvida uma vez
+        # (context pode conter chaves, então sem str.format)
+        context_suffix = f" in {context}."
+        emergency_sentences = [
+            {
+                "text": "This example shows how to use " + word + context_suffix,
                 "vocabulary_used": [word],
                 "context_situation": context,
                 "complexity_level": "simple"
-            })
+            }
+            for word in vocabulary_words
+        ]
         
         return {
             "sentences": emergency_sentences,
@@ -704,6 +1469,13 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     
     def _ensure_sentences_required_fields(self, sentences_data: Dict[str, Any]) -> Dict[str, Any]:
         """Garantir campos obrigatórios na seção de sentences."""
+        # Caminho rápido: saída bem-formada do LLM já tem todos os campos
+        if (
+            SENTENCES_SECTION_FIELDS <= sentences_data.keys()
+            and isinstance(sentences_data["sentences"], list)
+        ):
+            return sentences_data
+
         # Garantir campo sentences
         if "sentences" not in sentences_data or not isinstance(sentences_data["sentences"], list):
             sentences_data["sentences"] = []
@@ -726,48 +1498,36 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         return sentences_data
     
-    def _clean_sentences_data(self, sentences_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Limpar e validar estrutura de cada sentence."""
-        cleaned_sentences = []
+    def _clean_sentences_data(
+        self,
+        sentences_data: Dict[str, Any],
+        cleaned_sentences: Optional[List[Dict[str, Any]]] = None,
+        start_index: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Limpar e validar estrutura de cada sentence.
         
-        for i, sentence in enumerate(sentences_data.get("sentences", [])):
-            try:
-                if isinstance(sentence, dict):
-                    # Garantir campos obrigatórios
-                    cleaned_sentence = {
-                        "text": str(sentence.get("text", f"Sample sentence {i+1}")).strip(),
-                        "vocabulary_used": self._ensure_string_list(sentence.get("vocabulary_used", [])),
-                        "context_situation": str(sentence.get("context_situation", "general")).strip(),
-                        "complexity_level": str(sentence.get("complexity_level", "intermediate")).lower().strip(),
-                        "reinforces_previous": self._ensure_string_list(sentence.get("reinforces_previous", [])),
-                        "introduces_new": self._ensure_string_list(sentence.get("introduces_new", [])),
-                        "phonetic_features": self._ensure_string_list(sentence.get("phonetic_features", [])),
-                        "pronunciation_notes": sentence.get("pronunciation_notes")
-                    }
-                    
-                    # Validar complexity_level
-                    if cleaned_sentence["complexity_level"] not in ["simple", "intermediate", "complex"]:
-                        cleaned_sentence["complexity_level"] = "intermediate"
-                    
-                    # Validar tamanho mínimo do texto
-                    if len(cleaned_sentence["text"]) >= 10:
-                        cleaned_sentences.append(cleaned_sentence)
-                        
-            except Exception as e:
-                logger.warning(f"⚠️ Erro ao limpar sentence {i}: {str(e)}, sentence ignorada")
-                continue
+        cleaned_sentences/start_index permitem reaproveitar sentences já limpas
+        durante o streaming.
+        """
+        sentences = sentences_data.get("sentences", [])
+        cleaned_tail = [
+            cleaned_sentence
+            for i in range(start_index, len(sentences))
+            if (cleaned_sentence := self._clean_single_sentence(sentences[i], i))
+            is not None
+        ]
         
-        sentences_data["sentences"] = cleaned_sentences
+        sentences_data["sentences"] = list(cleaned_sentences or []) + cleaned_tail
         
         # Validar tipos numéricos
-        try:
-            sentences_data["vocabulary_coverage"] = max(0.0, min(1.0, float(sentences_data.get("vocabulary_coverage", 0.8))))
-            sentences_data["contextual_coherence"] = max(0.0, min(1.0, float(sentences_data.get("contextual_coherence", 0.8))))
-            sentences_data["progression_appropriateness"] = max(0.0, min(1.0, float(sentences_data.get("progression_appropriateness", 0.8))))
-        except (ValueError, TypeError):
-            sentences_data["vocabulary_coverage"] = 0.8
-            sentences_data["contextual_coherence"] = 0.8
-            sentences_data["progression_appropriateness"] = 0.8
+        # (campo inválido cai para o padrão sem afetar os demais)
+        for field in SENTENCES_SCORE_FIELDS:
+            try:
+                score = float(sentences_data.get(field, 0.8))
+            except (ValueError, TypeError):
+                score = 0.8
+            sentences_data[field] = max(0.0, min(1.0, score))
         
         # Garantir arrays de strings
         sentences_data["phonetic_progression"] = self._ensure_string_list(sentences_data.get("phonetic_progression", []))
@@ -775,33 +1535,227 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         return sentences_data
     
+    def _clean_single_sentence(
+        self, sentence: Any, index: int
+    ) -> Optional[Dict[str, Any]]:
+        """Limpar uma sentence individual. Retorna None se deve ser ignorada."""
+        try:
+            if not isinstance(sentence, dict):
+                return None
+
+            # Validar tamanho mínimo do texto antes de montar os demais campos
+            text = str(sentence.get("text", f"Sample sentence {index+1}")).strip()
+            if len(text) < 10:
+                return None
+
+            # Garantir campos obrigatórios
+            cleaned_sentence = {
+                "text": text,
+                "vocabulary_used": self._ensure_string_list(
+                    sentence.get("vocabulary_used", [])
+                ),
+                "context_situation": str(
+                    sentence.get("context_situation", "general")
+                ).strip(),
+                "complexity_level": str(
+                    sentence.get("complexity_level", "intermediate")
+                ).lower().strip(),
+                "reinforces_previous": self._ensure_string_list(
+                    sentence.get("reinforces_previous", [])
+                ),
+                "introduces_new": self._ensure_string_list(
+                    sentence.get("introduces_new", [])
+                ),
+                "phonetic_features": self._ensure_string_list(
+                    sentence.get("phonetic_features", [])
+                ),
+                "pronunciation_notes": sentence.get("pronunciation_notes")
+            }
+
+            # Validar complexity_level
+            if cleaned_sentence["complexity_level"] not in VALID_COMPLEXITY_LEVELS:
+                cleaned_sentence["complexity_level"] = "intermediate"
+
+            return cleaned_sentence
+
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Erro ao limpar sentence {index}: {str(e)}, sentence ignorada"
+            )
+            return None
+
     def _ensure_string_list(self, value: Any) -> List[str]:
         """Garantir que valor seja lista de strings."""
         if not isinstance(value, list):
             return []
         
-        result = []
-        for item in value:
-            if item and str(item).strip():
-                result.append(str(item).strip())
+        return [text for text in (str(item).strip() for item in value if item) if text]
+
+    async def _cached_llm_call(
+        self,
+        messages: List[Any],
+        schema: Optional[Dict[str, Any]] = None,
+        json_mode: bool = False
+    ) -> Any:
+        """
+        Chamar LLM com cache endereçado por conteúdo (mensagens + schema + modelo).
         
+        Com schema retorna o dict do structured output; sem schema retorna o texto
+        da resposta (com json_mode=True o texto é um objeto JSON garantido pela API).
+        """
+        cache_key = self._generate_llm_cache_key(messages, schema, json_mode)
+
+        cached_result = self._get_from_cache_with_ttl(cache_key)
+        if cached_result is not None:
+            logger.info("📦 Resposta LLM reutilizada do cache")
+            return cached_result
+
+        result = await self._invoke_llm_with_backoff(messages, schema, json_mode)
+
+        if result:
+            self._save_to_cache_with_ttl(cache_key, result)
         return result
     
+    def _generate_llm_cache_key(
+        self,
+        messages: List[Any],
+        schema: Optional[Dict[str, Any]] = None,
+        json_mode: bool = False
+    ) -> str:
+        """Chave de cache endereçada por conteúdo para uma chamada LLM."""
+        key_payload = {
+            "model": getattr(self.llm, "model_name", ""),
+            "messages": [str(message.content) for message in messages],
+            "schema": schema,
+            "json_mode": json_mode
+        }
+        return "llm:" + hashlib.blake2b(
+            json_dumps_bytes(key_payload, sort_keys=True), digest_size=16
+        ).hexdigest()
+
+    async def _invoke_llm_with_backoff(
+        self,
+        messages: List[Any],
+        schema: Optional[Dict[str, Any]] = None,
+        json_mode: bool = False
+    ) -> Any:
+        """Invocar LLM sob o semáforo da instância com backoff em rate limit."""
+        async def invoke() -> Any:
+            if schema is SIMPLE_SENTENCES_SCHEMA:
+                return await self._structured_simple_llm.ainvoke(messages)
+            if schema is not None:
+                return await self.llm.with_structured_output(schema).ainvoke(messages)
+            llm = self._json_mode_llm if json_mode else self.llm
+            response = await llm.ainvoke(messages)
+            return response.content
+
+        return await self._with_rate_limit_backoff(invoke)
+
+    async def _with_rate_limit_backoff(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Executar chamada LLM sob o semáforo, repetindo com backoff em rate limit."""
+        for attempt in range(self._llm_rate_limit_retries + 1):
+            try:
+                async with self._llm_semaphore:
+                    return await call()
+            except RateLimitError:
+                if attempt >= self._llm_rate_limit_retries:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(
+                    f"⚠️ Rate limit da OpenAI, nova tentativa em {delay}s "
+                    f"({attempt + 1}/{self._llm_rate_limit_retries})"
+                )
+                await asyncio.sleep(delay)
+
+    async def _stream_json_mode_sentences(
+        self, prompt_messages: List[Any]
+    ) -> Tuple[str, List[Dict[str, Any]], int]:
+        """
+        Gerar em JSON mode via streaming, limpando sentences completas na chegada.
+
+        Returns:
+            Tuple[str, List[Dict], int]: texto completo, sentences já limpas e
+            próximo índice a limpar
+        """
+        async def stream() -> Tuple[str, List[Dict[str, Any]], int]:
+            content_parts: List[str] = []
+            cleaned_sentences: List[Dict[str, Any]] = []
+            next_index = 0
+
+            async for chunk in self._json_mode_llm.astream(prompt_messages):
+                chunk_text = chunk.content if isinstance(chunk.content, str) else ""
+                content_parts.append(chunk_text)
+
+                # Só vale reparsear quando algum objeto pode ter sido fechado
+                if "}" in chunk_text:
+                    partial_data = parse_partial_json("".join(content_parts))
+                    next_index = self._clean_completed_sentences(
+                        partial_data, cleaned_sentences, next_index
+                    )
+
+            return "".join(content_parts), cleaned_sentences, next_index
+
+        return await self._with_rate_limit_backoff(stream)
+
+    def _clean_completed_sentences(
+        self,
+        partial_data: Any,
+        cleaned_sentences: List[Dict[str, Any]],
+        next_index: int
+    ) -> int:
+        """Limpar sentences completas de um JSON parcial; retorna o próximo índice."""
+        partial_sentences = (
+            partial_data.get("sentences") if isinstance(partial_data, dict) else None
+        )
+        if not isinstance(partial_sentences, list):
+            return next_index
+
+        # Todas exceto a última já foram emitidas por completo pelo parser parcial
+        while next_index < len(partial_sentences) - 1:
+            cleaned_sentence = self._clean_single_sentence(
+                partial_sentences[next_index], next_index
+            )
+            if cleaned_sentence is not None:
+                cleaned_sentences.append(cleaned_sentence)
+            next_index += 1
+        return next_index
+
     async def _generate_sentences_llm_fallback(self, prompt_messages: List[Any], request: SentencesGenerationRequest) -> Dict[str, Any]:
         """Fallback para geração sem structured output quando structured falha."""
         try:
             logger.info("🔄 Tentando geração fallback sem structured output...")
             
-            # Gerar usando LangChain tradicional
-            response = await self.llm.ainvoke(prompt_messages)
-            content = response.content
+            # Gerar em JSON mode: dispensa extração de markdown e parsing de texto
+            cache_key = self._generate_llm_cache_key(prompt_messages, json_mode=True)
+            content = self._get_from_cache_with_ttl(cache_key)
+            cleaned_sentences: List[Dict[str, Any]] = []
+            next_index = 0
+
+            if content is None:
+                content, cleaned_sentences, next_index = (
+                    await self._stream_json_mode_sentences(prompt_messages)
+                )
+                if content:
+                    self._save_to_cache_with_ttl(cache_key, content)
+            else:
+                logger.info("📦 Resposta LLM reutilizada do cache")
+
+            try:
+                sentences_data = json_loads(content)
+            except (JSONDecodeError, ValueError, TypeError):
+                sentences_data = None
             
-            # Processar resposta com múltiplas estratégias de parsing
-            sentences_data = await self._parse_llm_response_robust(content)
+            # Provedores que ignoram response_format: múltiplas estratégias de parsing
+            if not self._validate_sentences_structure(sentences_data):
+                sentences_data = await self._parse_llm_response_robust(content)
+                cleaned_sentences, next_index = [], 0
             
             # Aplicar limpeza rigorosa no fallback
+            # (sentences limpas durante o stream são reaproveitadas)
             sentences_data = self._ensure_sentences_required_fields(sentences_data)
-            sentences_data = self._clean_sentences_data(sentences_data)
+            sentences_data = self._clean_sentences_data(
+                sentences_data, cleaned_sentences, next_index
+            )
             
             logger.info(f"✅ Fallback gerou {len(sentences_data.get('sentences', []))} sentences")
             return sentences_data
@@ -816,19 +1770,15 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         # Estratégia 1: JSON direto
         try:
-            if "```json" in content:
-                json_content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                json_content = content.split("```")[1].strip()
-            else:
-                json_content = content.strip()
+            fence_match = _JSON_FENCE_RE.search(content)
+            json_content = (fence_match.group(1) if fence_match else content).strip()
             
-            sentences_data = json.loads(json_content)
+            sentences_data = json_loads(json_content)
             
             if self._validate_sentences_structure(sentences_data):
                 return sentences_data
                 
-        except (json.JSONDecodeError, ValueError, KeyError):
+        except (JSONDecodeError, ValueError, KeyError):
             logger.warning("⚠️ JSON parsing failed, trying structured extraction...")
         
         # Estratégia 2: Extração estruturada
@@ -857,26 +1807,38 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             sentences_list = await self._generate_intelligent_fallback_sentences(request)
             sentences_list = sentences_list["sentences"]
         
-        # Processar cada sentence com validação
-        processed_sentences = []
-        vocabulary_used = set()
-        complexity_progression = []
-        
-        for i, sentence_data in enumerate(sentences_list):
-            if isinstance(sentence_data, str):
+        def process_sentence(i: int, sentence_data: Any) -> Dict[str, Any]:
+            converted = isinstance(sentence_data, str)
+            if converted:
                 # Converter string simples para estrutura completa
-                sentence_obj = await self._convert_string_to_structured_sentence(
-                    sentence_data, vocabulary_analysis["vocabulary_words"], i, request
+                sentence_obj = self._convert_string_to_structured_sentence(
+                    sentence_data, vocabulary_analysis["vocabulary_lookup"], i, request
                 )
             else:
                 sentence_obj = sentence_data
             
-            # Validar e enriquecer sentence
-            enriched_sentence = await self._validate_and_enrich_sentence_advanced(
-                sentence_obj, vocabulary_analysis, request
+            # Validar e enriquecer sentence (conversão já mediu o texto)
+            return self._validate_and_enrich_sentence_advanced(
+                sentence_obj, vocabulary_analysis, request, text_metrics_ready=converted
             )
-            
-            processed_sentences.append(enriched_sentence)
+
+        def process_all() -> List[Dict[str, Any]]:
+            return [
+                process_sentence(i, sentence_data)
+                for i, sentence_data in enumerate(sentences_list)
+            ]
+
+        # Processamento puramente CPU: lotes usuais rodam direto; lotes grandes vão para
+        # uma thread para não segurar o event loop durante toda a análise
+        if len(sentences_list) > SENTENCE_ANALYSIS_OFFLOAD_THRESHOLD:
+            processed_sentences = await asyncio.to_thread(process_all)
+        else:
+            processed_sentences = process_all()
+
+        # Agregar métricas numa passada síncrona
+        vocabulary_used = set()
+        complexity_progression = []
+        for enriched_sentence in processed_sentences:
             vocabulary_used.update(enriched_sentence.get("vocabulary_used", []))
             complexity_progression.append(enriched_sentence.get("complexity_level", "intermediate"))
         
@@ -909,52 +1871,56 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         vocabulary_items = vocabulary_data.get("items", [])
         
         # Criar mapa palavra → dados fonéticos
-        phonetic_map = {}
-        for item in vocabulary_items:
-            word = item.get("word", "")
-            phoneme = item.get("phoneme", "")
-            if word and phoneme:
-                phonetic_map[word.lower()] = {
-                    "phoneme": phoneme,
-                    "syllables": item.get("syllable_count", 1),
-                    "stress_pattern": item.get("stress_pattern", ""),
-                    "ipa_variant": item.get("ipa_variant", "general_american"),
-                    "complexity": self._calculate_phonetic_complexity(phoneme)
-                }
+        phonetic_map = {
+            item["word"].lower(): {
+                "phoneme": item["phoneme"],
+                "syllables": item.get("syllable_count", 1),
+                "stress_pattern": item.get("stress_pattern", ""),
+                "ipa_variant": item.get("ipa_variant", "general_american"),
+                "complexity": self._calculate_phonetic_complexity(item["phoneme"])
+            }
+            for item in vocabulary_items
+            if item.get("word") and item.get("phoneme")
+        }
         
         # Analisar padrões fonéticos e conectividade
         phonetic_progression = []
         pronunciation_patterns = []
-        connectivity_analysis = []
         
         for i, sentence in enumerate(sentences):
             vocabulary_used = sentence.get("vocabulary_used", [])
-            sentence_phonetics = []
-            connectivity_score = 0
             
-            # Análise fonética
-            for word in vocabulary_used:
-                if word.lower() in phonetic_map:
-                    phonetic_data = phonetic_map[word.lower()]
-                    sentence_phonetics.append({
-                        "word": word,
-                        "phoneme": phonetic_data["phoneme"],
-                        "syllables": phonetic_data["syllables"],
-                        "complexity": phonetic_data["complexity"]
-                    })
+            # Análise fonética (um lookup por palavra)
+            sentence_phonetics = [
+                {
+                    "word": word,
+                    "phoneme": phonetic_data["phoneme"],
+                    "syllables": phonetic_data["syllables"],
+                    "complexity": phonetic_data["complexity"]
+                }
+                for word in vocabulary_used
+                if (phonetic_data := phonetic_map.get(word.lower())) is not None
+            ]
             
             # Enriquecer sentence com dados fonéticos
             if sentence_phonetics:
-                sentence = await self._enrich_sentence_with_phonetics(sentence, sentence_phonetics)
+                sentence = self._enrich_sentence_with_phonetics(
+                    sentence, sentence_phonetics
+                )
                 
                 avg_syllables = sum(p["syllables"] for p in sentence_phonetics) / len(sentence_phonetics)
                 phonetic_progression.append(f"Sentence {i+1}: {len(sentence_phonetics)} phonetic elements, avg {avg_syllables:.1f} syllables")
-            
-            # Análise de conectividade
+
+        # Análise de conectividade (independente do enriquecimento fonético)
+        connectivity_analysis = []
+        for i, sentence in enumerate(sentences):
             reinforced_words = sentence.get("reinforces_previous", [])
             if reinforced_words:
-                connectivity_score = len(reinforced_words) / max(len(vocabulary_used), 1)
-                connectivity_analysis.append(f"Sentence {i+1}: {connectivity_score:.1f} connectivity score")
+                vocabulary_count = max(len(sentence.get("vocabulary_used", [])), 1)
+                connectivity_analysis.append(
+                    f"Sentence {i+1}: {len(reinforced_words) / vocabulary_count:.1f} "
+                    f"connectivity score"
+                )
         
         # Identificar padrões de pronúncia globais
         global_patterns = self._identify_global_pronunciation_patterns(phonetic_map, sentences)
@@ -1025,23 +1991,7 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     
     def _calculate_phonetic_complexity(self, phoneme: str) -> str:
         """Calcular complexidade fonética de um fonema."""
-        if not phoneme:
-            return "simple"
-        
-        # Remover delimitadores
-        clean_phoneme = phoneme.strip('/[]')
-        
-        # Fatores de complexidade
-        complex_sounds = ["θ", "ð", "ʃ", "ʒ", "ŋ", "ɹ", "æ", "ʌ", "ɜː", "ɪə", "eə"]
-        stress_markers = clean_phoneme.count("ˈ") + clean_phoneme.count("ˌ")
-        sound_count = len([s for s in complex_sounds if s in clean_phoneme])
-        
-        if sound_count >= 3 or stress_markers >= 2:
-            return "complex"
-        elif sound_count >= 1 or stress_markers >= 1:
-            return "intermediate"
-        else:
-            return "simple"
+        return _phonetic_complexity(phoneme)
     
     def _determine_sentences_complexity_level(self, avg_syllables: float, word_classes: Dict[str, int], phonetic_complexity: Dict[str, str]) -> str:
         """Determinar nível de complexidade para geração de sentences."""
@@ -1053,7 +2003,9 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         adjective_ratio = word_classes.get("adjective", 0) / max(total_words, 1)
         
         # Análise fonética
-        complex_phonetics = len([word for word, complexity in phonetic_complexity.items() if complexity == "complex"])
+        complex_phonetics = sum(
+            1 for complexity in phonetic_complexity.values() if complexity == "complex"
+        )
         phonetic_ratio = complex_phonetics / max(len(phonetic_complexity), 1)
         
         # Determinar complexidade
@@ -1067,50 +2019,28 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     def _identify_sentence_connective_words(self, vocabulary_words: List[str], word_classes: Dict[str, int]) -> List[str]:
         """Identificar palavras-chave que facilitam conectividade em sentences."""
         
-        # Palavras que facilitam conexões naturais em sentences
-        connective_patterns = {
-            "high_frequency_verbs": ["be", "have", "do", "make", "take", "get", "go", "come", "see", "know"],
-            "common_prepositions": ["in", "on", "at", "with", "for", "to", "from", "by", "about"],
-            "versatile_adjectives": ["good", "bad", "big", "small", "new", "old", "important", "interesting"],
-            "temporal_adverbs": ["now", "today", "yesterday", "tomorrow", "always", "never", "usually"],
-            "modal_auxiliaries": ["can", "could", "will", "would", "should", "must", "may", "might"]
-        }
-        
-        key_words = []
-        for word in vocabulary_words:
-            word_lower = word.lower()
-            for category, patterns in connective_patterns.items():
-                if any(pattern in word_lower or word_lower == pattern for pattern in patterns):
-                    key_words.append(word)
-                    break
+        key_words = [
+            word for word in vocabulary_words
+            if _CONNECTIVE_PATTERN_RE.search(word.lower())
+        ]
         
         return key_words[:8]  # Top 8 palavras conectivas
     
     def _identify_thematic_clusters(self, vocabulary_items: List[Dict[str, Any]]) -> Dict[str, List[str]]:
         """Identificar clusters temáticos no vocabulário."""
         
-        # Definir campos semânticos comuns
-        semantic_fields = {
-            "hospitality": ["hotel", "reservation", "room", "service", "guest", "reception", "check-in", "booking"],
-            "business": ["meeting", "presentation", "client", "company", "office", "manager", "project", "deadline"],
-            "technology": ["computer", "internet", "software", "digital", "online", "app", "device", "system"],
-            "education": ["student", "teacher", "school", "university", "study", "learn", "course", "exam"],
-            "food": ["restaurant", "meal", "menu", "order", "cook", "eat", "drink", "kitchen"],
-            "travel": ["airport", "flight", "ticket", "luggage", "passport", "journey", "destination", "trip"],
-            "health": ["doctor", "hospital", "medicine", "treatment", "patient", "healthy", "illness", "exercise"],
-            "shopping": ["store", "price", "buy", "sell", "customer", "product", "payment", "discount"]
-        }
-        
         clusters = {}
         
         for item in vocabulary_items:
             word = item.get("word", "").lower()
-            for field, keywords in semantic_fields.items():
-                if any(keyword in word or word in keyword for keyword in keywords):
-                    if field not in clusters:
-                        clusters[field] = []
-                    clusters[field].append(item.get("word"))
-                    break
+            # Match exato resolve por hash; demais palavras passam pelos matchers
+            # de substring
+            if word in _KEYWORD_TO_FIELD:
+                field = _KEYWORD_TO_FIELD[word]
+            else:
+                field = _match_semantic_field(word)
+            if field is not None:
+                clusters.setdefault(field, []).append(item.get("word"))
         
         # Filtrar clusters com pelo menos 2 palavras
         return {field: words for field, words in clusters.items() if len(words) >= 2}
@@ -1129,14 +2059,20 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         """Analisar conectividade entre vocabulários na hierarquia."""
         
         # Converter para sets para análises
-        vocab_set = set(word.lower() for word in vocabulary_words)
-        taught_set = set(word.lower() for word in taught_vocabulary)
-        reinforcement_set = set(word.lower() for word in reinforcement_words)
-        
-        # Análises de intersecção
-        overlapping_words = vocab_set.intersection(taught_set)
-        new_words = vocab_set - taught_set
-        reinforcement_opportunities = reinforcement_set - vocab_set
+        vocab_set = {word.lower() for word in vocabulary_words}
+        taught_set = {word.lower() for word in taught_vocabulary}
+
+        # Particionar vocabulário em já ensinado / novo numa única passada
+        overlapping_words = []
+        new_words = []
+        for word in vocab_set:
+            (overlapping_words if word in taught_set else new_words).append(word)
+
+        # Reforço: palavras fora do vocabulário atual (sem materializar set de reforço)
+        reinforcement_opportunities = list({
+            word_lower for word in reinforcement_words
+            if (word_lower := word.lower()) not in vocab_set
+        })
         
         # Análise de progressão baseada na sequência
         progression_analysis = self._analyze_sequence_progression(sequence_order, len(vocab_set), len(taught_set))
@@ -1145,9 +2081,9 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         connectivity_potential = self._calculate_connectivity_potential(vocabulary_words, taught_vocabulary)
         
         return {
-            "new_words": list(new_words),
-            "overlapping_words": list(overlapping_words),
-            "reinforcement_opportunities": list(reinforcement_opportunities)[:5],
+            "new_words": new_words,
+            "overlapping_words": overlapping_words,
+            "reinforcement_opportunities": reinforcement_opportunities[:5],
             "connectivity_score": len(overlapping_words) / max(len(vocab_set), 1),
             "new_word_ratio": len(new_words) / max(len(vocab_set), 1),
             "progression_analysis": progression_analysis,
@@ -1190,71 +2126,13 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     def _get_sentence_complexity_guidance(self, cefr_level: str, sequence_order: int, vocabulary_complexity: str) -> Dict[str, Any]:
         """Obter orientações de complexidade para sentences."""
         
-        # Definir progressão de complexidade
-        complexity_progression_maps = {
-            "A1": {
-                "start_complexity": "very_simple",
-                "end_complexity": "simple",
-                "progression_pattern": "Linear progression from 3-4 words to 6-8 words",
-                "sentence_types": ["simple_statements", "basic_questions"],
-                "max_clauses": 1
-            },
-            "A2": {
-                "start_complexity": "simple",
-                "end_complexity": "intermediate",
-                "progression_pattern": "Build from simple to compound sentences",
-                "sentence_types": ["compound_sentences", "basic_complex"],
-                "max_clauses": 2
-            },
-            "B1": {
-                "start_complexity": "intermediate",
-                "end_complexity": "complex",
-                "progression_pattern": "Introduce complex structures gradually",
-                "sentence_types": ["complex_sentences", "conditional_structures"],
-                "max_clauses": 3
-            },
-            "B2": {
-                "start_complexity": "complex",
-                "end_complexity": "sophisticated",
-                "progression_pattern": "Use varied complex structures",
-                "sentence_types": ["multi_clause", "embedded_structures"],
-                "max_clauses": 4
-            },
-            "C1": {
-                "start_complexity": "sophisticated",
-                "end_complexity": "advanced",
-                "progression_pattern": "Native-like structural variety",
-                "sentence_types": ["advanced_structures", "discourse_markers"],
-                "max_clauses": 5
-            },
-            "C2": {
-                "start_complexity": "advanced",
-                "end_complexity": "native_level",
-                "progression_pattern": "Natural complexity with stylistic variation",
-                "sentence_types": ["native_structures", "stylistic_variety"],
-                "max_clauses": 6
-            }
-        }
-        
-        base_guidance = complexity_progression_maps.get(cefr_level, complexity_progression_maps["A2"])
-        
-        # Ajustar baseado na posição da sequência
-        if sequence_order <= 3:
-            base_guidance["adjustment"] = "Keep slightly simpler for early units"
-        elif sequence_order >= 10:
-            base_guidance["adjustment"] = "Allow more complexity for later units"
-        else:
-            base_guidance["adjustment"] = "Standard progression"
-        
-        # Ajustar baseado na complexidade do vocabulário
-        if vocabulary_complexity == "complex":
-            base_guidance["vocabulary_adjustment"] = "Use simpler sentence structures to balance vocabulary complexity"
-        elif vocabulary_complexity == "simple":
-            base_guidance["vocabulary_adjustment"] = "Can use more complex sentence structures"
-        else:
-            base_guidance["vocabulary_adjustment"] = "Balanced complexity"
-        
-        return base_guidance
+        # Orientação resolvida uma vez por combinação; cópia rasa evita mutação do
+        # resultado memoizado
+        return dict(_sentence_complexity_guidance(
+            cefr_level,
+            _sequence_complexity_adjustment(sequence_order),
+            vocabulary_complexity
+        ))
     
     # =============================================================================
     # HELPER METHODS - CACHE E PERFORMANCE
@@ -1264,39 +2142,47 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         """Gerar chave de cache inteligente baseada em contexto."""
         
         # Componentes da chave
-        unit_context = request.unit_data.get("context", "")
+        # (contexto limitado: o prompt completo é derivado destes campos)
+        unit_context = request.unit_data.get("context", "")[:512]
         vocabulary_words = [item.get("word") for item in request.vocabulary_data.get("items", [])][:10]
         cefr_level = request.unit_data.get("cefr_level", "A2")
         sequence_order = request.hierarchy_context.get("sequence_order", 1)
         
-        # Criar hash baseado em componentes críticos
-        key_components = [
-            unit_context,
-            "|".join(sorted(vocabulary_words)),
-            cefr_level,
-            str(sequence_order),
-            str(request.target_sentence_count or request.target_sentences)
-        ]
-        
-        key_string = "|".join(key_components)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # Alimentar o hash componente a componente
+        # (sem serializar um payload intermediário)
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(unit_context.encode("utf-8"))
+        hasher.update(CACHE_KEY_SEPARATOR)
+        for word in sorted(str(word) for word in vocabulary_words):
+            hasher.update(word.encode("utf-8"))
+            hasher.update(CACHE_KEY_SEPARATOR)
+        hasher.update(CACHE_KEY_SEPARATOR)
+        hasher.update(str(cefr_level).encode("utf-8"))
+        hasher.update(CACHE_KEY_SEPARATOR)
+        hasher.update(str(sequence_order).encode("ascii"))
+        hasher.update(CACHE_KEY_SEPARATOR)
+        target_count = request.target_sentence_count or request.target_sentences
+        hasher.update(str(target_count).encode("ascii"))
+        return hasher.hexdigest()
     
     def _get_from_cache_with_ttl(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Obter do cache com verificação de TTL."""
         
         current_time = time.time()
         
-        # Verificar se existe e não expirou
-        if (cache_key in self._memory_cache and 
-            cache_key in self._cache_expiry and
-            current_time < self._cache_expiry[cache_key]):
-            return self._memory_cache[cache_key]
+        # Verificar se existe e não expirou (hit vira o mais recente na ordem LRU)
+        expiry_time = self._cache_expiry.get(cache_key)
+        if (expiry_time is not None and
+            current_time < expiry_time and
+            cache_key in self._memory_cache):
+            self._memory_cache.move_to_end(cache_key)
+            # Cópia por hit: os chamadores reescrevem os dicts in-place e o
+            # serviço é singleton
+            return copy.deepcopy(self._memory_cache[cache_key])
         
         # Limpar entrada expirada
-        if cache_key in self._memory_cache:
-            del self._memory_cache[cache_key]
-        if cache_key in self._cache_expiry:
-            del self._cache_expiry[cache_key]
+        self._memory_cache.pop(cache_key, None)
+        self._cache_expiry.pop(cache_key, None)
         
         return None
     
@@ -1305,39 +2191,122 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         current_time = time.time()
         
-        # Limpar cache se muito grande
-        if len(self._memory_cache) >= self._max_cache_size:
+        # Salvar cópia com timestamp de expiração como entrada mais recente
+        # (o chamador continua mutando o próprio dict após salvar)
+        self._memory_cache[cache_key] = copy.deepcopy(data)
+        self._memory_cache.move_to_end(cache_key)
+        expiry_time = current_time + self._cache_ttl
+        self._cache_expiry[cache_key] = expiry_time
+        heapq.heappush(self._expiry_heap, (expiry_time, cache_key))
+        # Regravações e expirações lidas no get deixam entradas obsoletas mesmo
+        # com o cache abaixo do limite
+        self._compact_expiry_heap()
+
+        # Limpar cache se muito grande: expiradas primeiro, depois as menos usadas
+        # (O(1) cada)
+        if len(self._memory_cache) > self._max_cache_size:
             self._cleanup_cache()
-        
-        # Salvar com timestamp de expiração
-        self._memory_cache[cache_key] = data
-        self._cache_expiry[cache_key] = current_time + self._cache_ttl
+            while len(self._memory_cache) > self._max_cache_size:
+                evicted_key, _ = self._memory_cache.popitem(last=False)
+                self._cache_expiry.pop(evicted_key, None)
     
     def _cleanup_cache(self) -> None:
         """Limpar entradas expiradas do cache."""
         
         current_time = time.time()
-        expired_keys = [
-            key for key, expiry_time in self._cache_expiry.items()
-            if current_time >= expiry_time
-        ]
         
-        for key in expired_keys:
-            if key in self._memory_cache:
-                del self._memory_cache[key]
-            if key in self._cache_expiry:
-                del self._cache_expiry[key]
+        # Só as entradas vencidas são visitadas (topo do heap), sem varrer todo o cache
+        expired_keys = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= current_time:
+            expiry_time, key = heapq.heappop(self._expiry_heap)
+            # Entrada obsoleta: chave regravada com nova expiração ou já removida
+            if self._cache_expiry.get(key) == expiry_time:
+                expired_keys.append(key)
+
+        if len(expired_keys) > len(self._cache_expiry) // 4:
+            # Lote grande: reconstruir os dicts compacta a tabela em vez de N
+            # deletes (ordem LRU preservada)
+            self._cache_expiry = {
+                key: expiry_time for key, expiry_time in self._cache_expiry.items()
+                if expiry_time > current_time
+            }
+            self._memory_cache = OrderedDict(
+                (key, value) for key, value in self._memory_cache.items()
+                if key in self._cache_expiry
+            )
+        else:
+            for key in expired_keys:
+                # Chave pode repetir no heap (dois saves no mesmo tick)
+                self._memory_cache.pop(key, None)
+                self._cache_expiry.pop(key, None)
+
+        self._compact_expiry_heap()
+
+    def _compact_expiry_heap(self) -> None:
+        """Reconstruir o heap de expiração quando entradas obsoletas dominarem."""
+        if len(self._expiry_heap) > 4 * self._max_cache_size:
+            self._expiry_heap = [
+                (expiry_time, key) for key, expiry_time in self._cache_expiry.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _generate_recent_section_key(
+        self,
+        unit_data: Dict[str, Any],
+        vocabulary_data: Dict[str, Any],
+        hierarchy_context: Dict[str, Any],
+        target_count: int
+    ) -> str:
+        """
+        Gerar chave estável (book, CEFR, contexto, target, assinatura do vocabulário).
+
+        Imagens e timestamps não entram na chave.
+        """
         
-        # Se ainda muito grande, remover os mais antigos
-        if len(self._memory_cache) >= self._max_cache_size:
-            sorted_keys = sorted(self._cache_expiry.keys(), key=lambda k: self._cache_expiry[k])
-            keys_to_remove = sorted_keys[:len(sorted_keys)//2]
-            
-            for key in keys_to_remove:
-                if key in self._memory_cache:
-                    del self._memory_cache[key]
-                if key in self._cache_expiry:
-                    del self._cache_expiry[key]
+        vocabulary_words = sorted(
+            str(item.get("word", "")) for item in vocabulary_data.get("items", [])
+        )
+        key_payload = {
+            "book": (
+                hierarchy_context.get("book_id")
+                or hierarchy_context.get("book_name", "")
+            ),
+            "cefr_level": unit_data.get("cefr_level", "A2"),
+            "context": unit_data.get("context", ""),
+            "target_count": target_count,
+            "vocabulary": vocabulary_words
+        }
+
+        return hashlib.blake2b(
+            json_dumps_bytes(key_payload, sort_keys=True), digest_size=16
+        ).hexdigest()
+
+    def _get_recent_section(self, section_key: str) -> Optional[SentencesSection]:
+        """Obter SentencesSection recente se ainda dentro da janela de reutilização."""
+
+        entry = self._recent_sections.get(section_key)
+        if entry is None:
+            return None
+
+        expiry_time, section = entry
+        if time.time() >= expiry_time:
+            del self._recent_sections[section_key]
+            return None
+
+        return section
+
+    def _save_recent_section(self, section_key: str, section: SentencesSection) -> None:
+        """Salvar SentencesSection recente descartando a mais antiga se cheio."""
+
+        recent_sections = self._recent_sections
+        if (
+            section_key not in recent_sections
+            and len(recent_sections) >= self._recent_sections_max_size
+        ):
+            del recent_sections[next(iter(recent_sections))]
+
+        expiry_time = time.time() + self._recent_sections_ttl
+        recent_sections[section_key] = (expiry_time, section)
     
     # =============================================================================
     # HELPER METHODS - PARSING E ESTRUTURAÇÃO
@@ -1357,14 +2326,11 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         if not isinstance(sentences, list) or len(sentences) == 0:
             return False
         
-        # Verificar estrutura de pelo menos uma sentence
-        for sentence in sentences[:3]:  # Verificar primeiras 3
-            if not isinstance(sentence, dict):
-                return False
-            if "text" not in sentence or not sentence["text"]:
-                return False
-        
-        return True
+        # Verificar estrutura das primeiras 3 sentences (sem copiar a lista)
+        return all(
+            isinstance(sentence, dict) and sentence.get("text")
+            for sentence in islice(sentences, 3)
+        )
     
     async def _extract_sentences_structured(self, content: str) -> Dict[str, Any]:
         """Extrair sentences usando parsing estruturado."""
@@ -1391,12 +2357,12 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
                 }
             
             # Detectar campos específicos
-            elif "vocabulary_used:" in line.lower():
+            elif "vocabulary_used:" in (line_lower := line.lower()):
                 vocab_part = line.split(":", 1)[1].strip()
                 vocab_words = [w.strip() for w in vocab_part.split(",")]
                 current_sentence["vocabulary_used"] = vocab_words
             
-            elif "context:" in line.lower():
+            elif "context:" in line_lower:
                 context = line.split(":", 1)[1].strip()
                 current_sentence["context_situation"] = context
         
@@ -1420,20 +2386,16 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         # Estratégias múltiplas de extração
         sentences = []
-        import re
-
-        # Estratégia 1: Por numeração
-        numbered_pattern = r'^\d+\.\s*(.+)'
-
         
+        # Estratégia 1: Por numeração
         for line in text.split('\n'):
-            match = re.match(numbered_pattern, line.strip())
+            match = _NUMBERED_LINE_RE.match(line.strip())
             if match:
                 sentences.append(match.group(1).strip())
         
         # Estratégia 2: Por pontuação
         if not sentences:
-            sentence_candidates = re.split(r'[.!?]+', text)
+            sentence_candidates = _SENTENCE_SPLIT_RE.split(text)
             sentences = [s.strip() for s in sentence_candidates if len(s.strip()) > 15]
         
         # Estratégia 3: Por linhas significativas
@@ -1462,14 +2424,20 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             "progression_appropriateness": 0.6
         }
     
-    async def _convert_string_to_structured_sentence(self, sentence_text: str, vocabulary_words: List[str], index: int, request: SentencesGenerationRequest) -> Dict[str, Any]:
+    def _convert_string_to_structured_sentence(
+        self,
+        sentence_text: str,
+        vocabulary_lookup: List[Tuple[str, str]],
+        index: int,
+        request: SentencesGenerationRequest
+    ) -> Dict[str, Any]:
         """Converter string simples para objeto de sentence estruturado com contexto."""
         
+        # Minúsculas calculadas uma vez e compartilhadas pelos analisadores abaixo
+        text_lower = sentence_text.lower()
+
         # Identificar vocabulário usado na sentence
-        vocabulary_used = []
-        for word in vocabulary_words:
-            if word.lower() in sentence_text.lower():
-                vocabulary_used.append(word)
+        vocabulary_used = _match_vocabulary(text_lower, vocabulary_lookup)
         
         # Determinar complexidade baseada em múltiplos fatores
         word_count = len(sentence_text.split())
@@ -1484,7 +2452,9 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         # Determinar contexto baseado no tema da unidade
         unit_context = request.unit_data.get("context", "")
-        context_situation = self._infer_context_situation(sentence_text, unit_context, index)
+        context_situation = self._infer_context_situation(
+            text_lower, unit_context, index
+        )
         
         return {
             "text": sentence_text,
@@ -1496,51 +2466,64 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             "phonetic_features": [],
             "pronunciation_notes": None,
             "sentence_length": word_count,
-            "grammatical_focus": self._identify_grammatical_focus(sentence_text)
+            "grammatical_focus": self._identify_grammatical_focus(text_lower)
         }
     
-    async def _validate_and_enrich_sentence_advanced(self, sentence_obj: Dict[str, Any], vocabulary_analysis: Dict[str, Any], request: SentencesGenerationRequest) -> Dict[str, Any]:
-        """Validar e enriquecer objeto de sentence com análise avançada."""
+    def _validate_and_enrich_sentence_advanced(
+        self,
+        sentence_obj: Dict[str, Any],
+        vocabulary_analysis: Dict[str, Any],
+        request: SentencesGenerationRequest,
+        text_metrics_ready: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Validar e enriquecer objeto de sentence com análise avançada.
         
-        vocabulary_words = vocabulary_analysis["vocabulary_words"]
+        text_metrics_ready indica que sentence_length e grammatical_focus já foram
+        calculados sobre o mesmo texto (sentence convertida por
+        _convert_string_to_structured_sentence).
+        """
         
-        # Campos obrigatórios com valores padrão inteligentes
-        required_fields = {
-            "text": "Sample sentence using vocabulary.",
-            "vocabulary_used": [],
-            "context_situation": "general_context",
-            "complexity_level": "intermediate",
-            "reinforces_previous": [],
-            "introduces_new": [],
-            "phonetic_features": [],
-            "pronunciation_notes": None
-        }
+        vocabulary_lookup = vocabulary_analysis["vocabulary_lookup"]
         
-        for field, default_value in required_fields.items():
+        # Campos obrigatórios com valores padrão inteligentes
+        # (listas novas só para campos ausentes)
+        for field, default_value in SENTENCE_SCALAR_DEFAULTS.items():
             if field not in sentence_obj:
                 sentence_obj[field] = default_value
+        for field in SENTENCE_LIST_FIELDS:
+            if field not in sentence_obj:
+                sentence_obj[field] = []
         
         # Validar e corrigir vocabulário usado
         text = sentence_obj.get("text", "")
+        text_lower = text.lower()
         declared_vocab = sentence_obj.get("vocabulary_used", [])
-        actual_vocab = [word for word in vocabulary_words if word.lower() in text.lower()]
+        actual_vocab = _match_vocabulary(text_lower, vocabulary_lookup)
         
         # Corrigir vocabulário se necessário
-        if set(actual_vocab) != set(declared_vocab):
+        # Listas idênticas (caso comum, já na ordem do vocabulário) dispensam montar
+        # os dois sets
+        if actual_vocab != declared_vocab and set(actual_vocab) != set(declared_vocab):
             sentence_obj["vocabulary_used"] = actual_vocab
             sentence_obj["introduces_new"] = actual_vocab
         
         # Analisar palavras de reforço
-        taught_vocabulary = request.rag_context.get("taught_vocabulary", [])
-        reinforcement_words = [word for word in taught_vocabulary if word.lower() in text.lower()]
-        sentence_obj["reinforces_previous"] = reinforcement_words
+        sentence_obj["reinforces_previous"] = _match_vocabulary(
+            text_lower, vocabulary_analysis["taught_lookup"]
+        )
         
         # Enriquecer com análise gramatical
-        sentence_obj["grammatical_focus"] = self._identify_grammatical_focus(text)
-        sentence_obj["sentence_length"] = len(text.split())
+        if not text_metrics_ready:
+            sentence_obj["grammatical_focus"] = self._identify_grammatical_focus(
+                text_lower
+            )
+            sentence_obj["sentence_length"] = len(text.split())
         
         # Determinar função comunicativa
-        sentence_obj["communicative_function"] = self._determine_communicative_function(text)
+        sentence_obj["communicative_function"] = self._determine_communicative_function(
+            text_lower
+        )
         
         return sentence_obj
     
@@ -1557,17 +2540,14 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             return 0.7  # Score padrão se não há contexto
         
         # Palavras-chave do contexto
-        context_keywords = set(unit_context.split())
+        context_keywords = _text_word_set(unit_context)
         
-        coherent_sentences = 0
-        for sentence in sentences:
-            sentence_text = sentence.get("text", "").lower()
-            sentence_words = set(sentence_text.split())
-            
-            # Verificar sobreposição de palavras-chave
-            overlap = len(context_keywords.intersection(sentence_words))
-            if overlap > 0:
-                coherent_sentences += 1
+        # Verificar sobreposição de palavras-chave
+        # (conjuntos de palavras memoizados por texto)
+        coherent_sentences = sum(
+            1 for sentence in sentences
+            if not context_keywords.isdisjoint(_text_word_set(sentence.get("text", "")))
+        )
         
         return coherent_sentences / max(len(sentences), 1)
     
@@ -1578,23 +2558,13 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             return 0.7
         
         # Mapear complexidades para valores numéricos
-        complexity_values = {
-            "simple": 1,
-            "very_simple": 0.5,
-            "intermediate": 2,
-            "complex": 3,
-            "sophisticated": 4,
-            "advanced": 5
-        }
-        
-        # Calcular progressão
-        values = [complexity_values.get(comp, 2) for comp in complexity_progression]
+        values = [
+            COMPLEXITY_NUMERIC_VALUES.get(comp, 2) for comp in complexity_progression
+        ]
         
         # Verificar se há progressão crescente ou estável
-        progression_score = 0
-        for i in range(1, len(values)):
-            if values[i] >= values[i-1]:  # Permite progressão ou estabilidade
-                progression_score += 1
+        # (pares consecutivos comparados em C)
+        progression_score = sum(map(operator.ge, values[1:], values))
         
         return progression_score / max(len(values) - 1, 1)
     
@@ -1608,16 +2578,19 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         # Verificar quantas sentences usam vocabulário dos clusters principais
         main_themes = list(thematic_clusters.keys())[:3]  # Top 3 temas
-        thematic_sentences = 0
         
-        for sentence in sentences:
-            vocabulary_used = [word.lower() for word in sentence.get("vocabulary_used", [])]
-            
-            for theme in main_themes:
-                theme_words = [word.lower() for word in thematic_clusters[theme]]
-                if any(word in vocabulary_used for word in theme_words):
-                    thematic_sentences += 1
-                    break
+        # Palavras dos temas principais em minúsculas, montadas uma vez
+        # (não por sentence)
+        theme_words = frozenset(
+            word.lower() for theme in main_themes for word in thematic_clusters[theme]
+        )
+
+        thematic_sentences = sum(
+            1 for sentence in sentences
+            if not theme_words.isdisjoint(
+                word.lower() for word in sentence.get("vocabulary_used", [])
+            )
+        )
         
         return thematic_sentences / max(len(sentences), 1)
     
@@ -1627,16 +2600,9 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         complexities = [sentence.get("complexity_level", "intermediate") for sentence in sentences]
         
         # Complexidades esperadas por nível CEFR
-        expected_complexities = {
-            "A1": ["simple", "very_simple"],
-            "A2": ["simple", "intermediate"],
-            "B1": ["intermediate", "complex"],
-            "B2": ["intermediate", "complex", "sophisticated"],
-            "C1": ["complex", "sophisticated", "advanced"],
-            "C2": ["sophisticated", "advanced"]
-        }
-        
-        expected = expected_complexities.get(cefr_level, ["intermediate"])
+        expected = VALIDATION_EXPECTED_COMPLEXITIES.get(
+            cefr_level, DEFAULT_EXPECTED_COMPLEXITIES
+        )
         
         # Verificar adequação
         appropriate_count = 0
@@ -1665,14 +2631,17 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         vocabulary_items = vocabulary_data.get("items", [])
         target_words = [item.get("word", "").lower() for item in vocabulary_items]
         
+        target_set = frozenset(target_words)
+
         # Coletar palavras usadas
-        used_words = set()
-        for sentence in sentences:
-            vocabulary_used = sentence.get("vocabulary_used", [])
-            used_words.update([word.lower() for word in vocabulary_used])
+        used_words = {
+            word.lower()
+            for sentence in sentences
+            for word in sentence.get("vocabulary_used", [])
+        }
         
         # Calcular cobertura
-        coverage = len(used_words.intersection(set(target_words))) / max(len(target_words), 1)
+        coverage = len(used_words & target_set) / max(len(target_words), 1)
         is_adequate = coverage >= 0.8  # 80% de cobertura mínima
         
         missing_words = [word for word in target_words if word not in used_words]
@@ -1692,22 +2661,15 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         if not unit_context:
             return {"is_coherent": True, "coherence_score": 0.8}
         
-        context_keywords = set(unit_context.lower().split())
+        context_keywords = _text_word_set(unit_context)
         coherent_count = 0
         
         for sentence in sentences:
-            sentence_text = sentence.get("text", "").lower()
-            context_situation = sentence.get("context_situation", "").lower()
-            
-            # Verificar se a sentence se relaciona com o contexto
-            sentence_words = set(sentence_text.split())
-            situation_words = set(context_situation.split())
-            
-            # Calcular sobreposição
-            text_overlap = len(context_keywords.intersection(sentence_words))
-            situation_overlap = len(context_keywords.intersection(situation_words))
-            
-            if text_overlap > 0 or situation_overlap > 0:
+            # Verificar se a sentence (texto ou situação) se relaciona com o contexto
+            text_words = _text_word_set(sentence.get("text", ""))
+            situation_words = _text_word_set(sentence.get("context_situation", ""))
+            if (not context_keywords.isdisjoint(text_words) or
+                    not context_keywords.isdisjoint(situation_words)):
                 coherent_count += 1
         
         coherence_score = coherent_count / max(len(sentences), 1)
@@ -1784,6 +2746,10 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         best_score = -1
         best_idx = None
         
+        # Palavras-chave do contexto da unidade numa única alternação
+        # (memoizada entre chamadas)
+        unit_keyword_re = _context_keyword_pattern(request.unit_data.get("context", ""))
+
         for i, sentence in enumerate(sentences):
             score = 0
             
@@ -1796,13 +2762,15 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             
             # Critério 2: Contexto relacionado
             context_situation = sentence.get("context_situation", "").lower()
-            unit_context = request.unit_data.get("context", "").lower()
-            if any(keyword in context_situation for keyword in unit_context.split()):
+            if (
+                unit_keyword_re is not None
+                and unit_keyword_re.search(context_situation)
+            ):
                 score += 2
             
             # Critério 3: Complexidade adequada (não muito complexa)
             complexity = sentence.get("complexity_level", "intermediate")
-            if complexity in ["simple", "intermediate"]:
+            if complexity in LOW_COMPLEXITY_LEVELS:
                 score += 1
             
             if score > best_score:
@@ -1828,31 +2796,44 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     # HELPER METHODS - ANÁLISE FONÉTICA E CONECTIVIDADE
     # =============================================================================
     
-    async def _enrich_sentence_with_phonetics(self, sentence: Dict[str, Any], sentence_phonetics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _enrich_sentence_with_phonetics(
+        self,
+        sentence: Dict[str, Any],
+        sentence_phonetics: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
         """Enriquecer sentence com dados fonéticos."""
         
         if "phonetic_features" not in sentence:
             sentence["phonetic_features"] = []
         
+        # Passada única: sílabas, caracteres IPA presentes e marcas de stress
+        # (sem string concatenada)
+        syllable_total = 0
+        stress_count = 0
+        seen_symbols = set()
+        for phonetic in sentence_phonetics:
+            phoneme = phonetic["phoneme"]
+            syllable_total += phonetic["syllables"]
+            stress_count += _count_stress_marks(phoneme)
+            seen_symbols.update(phoneme)
+
         # Analisar características fonéticas
-        avg_syllables = sum(p["syllables"] for p in sentence_phonetics) / len(sentence_phonetics)
+        avg_syllables = syllable_total / len(sentence_phonetics)
         
         # Adicionar características baseadas na análise
         if avg_syllables > 2.5:
             sentence["phonetic_features"].append("multisyllabic_focus")
         
-        # Identificar sons específicos
-        all_phonemes = " ".join([p["phoneme"] for p in sentence_phonetics])
-        
-        difficult_sounds = ["θ", "ð", "ŋ", "ʃ", "ʒ", "ɹ"]
-        present_sounds = [sound for sound in difficult_sounds if sound in all_phonemes]
+        # Identificar sons específicos (um caractere cada; ordem da lista preservada)
+        present_sounds = [
+            sound for sound in SENTENCE_DIFFICULT_SOUNDS if sound in seen_symbols
+        ]
         
         if present_sounds:
             sentence["phonetic_features"].append("challenging_sounds")
             sentence["pronunciation_notes"] = f"Focus on sounds: {', '.join(present_sounds)}"
         
         # Analisar padrões de stress
-        stress_count = all_phonemes.count("ˈ") + all_phonemes.count("ˌ")
         if stress_count >= 2:
             sentence["phonetic_features"].append("stress_pattern_practice")
         
@@ -1868,40 +2849,52 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         for sentence in sentences:
             vocabulary_used = sentence.get("vocabulary_used", [])
             for word in vocabulary_used:
-                if word.lower() in phonetic_map:
-                    all_phonetic_data.append(phonetic_map[word.lower()])
+                phonetic_data = phonetic_map.get(word.lower())
+                if phonetic_data is not None:
+                    all_phonetic_data.append(phonetic_data)
         
         if not all_phonetic_data:
             return patterns
         
-        # Analisar padrões de stress
-        stress_types = []
+        # Passada única: stress, sílabas e fonemas distintos
+        has_primary_stress = has_secondary_stress = False
+        syllable_total = 0
+        max_syllables = None
+        distinct_phonemes = set()
         for data in all_phonetic_data:
             phoneme = data["phoneme"]
-            if "ˈ" in phoneme:
-                stress_types.append("primary_stress")
-            if "ˌ" in phoneme:
-                stress_types.append("secondary_stress")
+            syllables = data["syllables"]
+            has_primary_stress = has_primary_stress or "ˈ" in phoneme
+            has_secondary_stress = has_secondary_stress or "ˌ" in phoneme
+            syllable_total += syllables
+            if max_syllables is None or syllables > max_syllables:
+                max_syllables = syllables
+            distinct_phonemes.add(phoneme)
         
-        if stress_types:
-            unique_stress = set(stress_types)
-            patterns.append(f"Stress patterns: {len(unique_stress)} types across sentences")
+        # Analisar padrões de stress
+        stress_type_count = has_primary_stress + has_secondary_stress
+        if stress_type_count:
+            patterns.append(
+                f"Stress patterns: {stress_type_count} types across sentences"
+            )
         
         # Analisar distribuição de sílabas
-        syllable_counts = [data["syllables"] for data in all_phonetic_data]
-        if syllable_counts:
-            avg_syllables = sum(syllable_counts) / len(syllable_counts)
-            max_syllables = max(syllable_counts)
-            patterns.append(f"Syllable complexity: avg {avg_syllables:.1f}, max {max_syllables}")
+        avg_syllables = syllable_total / len(all_phonetic_data)
+        patterns.append(
+            f"Syllable complexity: avg {avg_syllables:.1f}, max {max_syllables}"
+        )
         
-        # Analisar sons específicos
-        all_phonemes = " ".join([data["phoneme"] for data in all_phonetic_data])
+        # Analisar sons específicos (símbolos de um caractere por conjunto;
+        # dígrafos IPA por fonema distinto)
+        phoneme_chars = set().union(*distinct_phonemes)
         
-        vowel_sounds = ["æ", "ʌ", "ɜː", "ɪ", "ʊ", "ə"]
-        consonant_clusters = ["θ", "ð", "ʃ", "ʒ", "ŋ", "ɹ"]
+        def sound_present(sound: str) -> bool:
+            if len(sound) == 1:
+                return sound in phoneme_chars
+            return any(sound in phoneme for phoneme in distinct_phonemes)
         
-        present_vowels = [v for v in vowel_sounds if v in all_phonemes]
-        present_consonants = [c for c in consonant_clusters if c in all_phonemes]
+        present_vowels = [v for v in GLOBAL_VOWEL_SOUNDS if sound_present(v)]
+        present_consonants = [c for c in GLOBAL_CONSONANT_SOUNDS if sound_present(c)]
         
         if present_vowels:
             patterns.append(f"Vowel focus: {len(present_vowels)} challenging vowel sounds")
@@ -1949,59 +2942,43 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     # HELPER METHODS - ANÁLISE SEMÂNTICA E CONTEXTUAL
     # =============================================================================
     
-    def _infer_context_situation(self, sentence_text: str, unit_context: str, index: int) -> str:
-        """Inferir situação contextual de uma sentence."""
-        
-        # Mapear contextos comuns
-        context_mappings = {
-            "hotel": ["check_in", "reservation", "room_service", "reception"],
-            "restaurant": ["ordering", "menu_reading", "paying_bill", "reservation"],
-            "business": ["meeting", "presentation", "negotiation", "planning"],
-            "travel": ["airport", "transportation", "directions", "booking"],
-            "education": ["classroom", "studying", "examination", "discussion"],
-            "shopping": ["purchasing", "asking_prices", "comparing_products", "payment"]
-        }
+    def _infer_context_situation(
+        self, sentence_lower: str, unit_context: str, index: int
+    ) -> str:
+        """Inferir situação contextual de uma sentence (texto já em minúsculas)."""
         
         # Identificar contexto principal
-        unit_context_lower = unit_context.lower()
-        sentence_lower = sentence_text.lower()
+        main_context = _main_context_for(unit_context)
+
+        if main_context is None:
+            # Contexto padrão baseado no índice
+            return DEFAULT_CONTEXT_SITUATIONS[index % len(DEFAULT_CONTEXT_SITUATIONS)]
         
-        for main_context, situations in context_mappings.items():
-            if main_context in unit_context_lower:
-                # Escolher situação baseada no conteúdo da sentence
-                for situation in situations:
-                    if any(word in sentence_lower for word in situation.split('_')):
-                        return situation
-                # Se não encontrou situação específica, usar a primeira
-                return situations[index % len(situations)]
+        # Escolher situação baseada no conteúdo da sentence
+        for situation, situation_re in _CONTEXT_SITUATION_MATCHERS[main_context]:
+            if situation_re.search(sentence_lower):
+                return situation
         
-        # Contexto padrão baseado no índice
-        default_contexts = ["general_conversation", "daily_interaction", "practical_situation", "social_context"]
-        return default_contexts[index % len(default_contexts)]
+        # Se não encontrou situação específica, rotacionar pelo índice
+        situations = CONTEXT_SITUATION_MAPPINGS[main_context]
+        return situations[index % len(situations)]
     
-    def _identify_grammatical_focus(self, sentence_text: str) -> List[str]:
-        """Identificar foco gramatical de uma sentence."""
+    def _identify_grammatical_focus(self, text_lower: str) -> List[str]:
+        """Identificar foco gramatical de uma sentence (texto já em minúsculas)."""
         
         focus_areas = []
-        text_lower = sentence_text.lower()
+        tokens = frozenset(_WORD_TOKEN_RE.findall(text_lower))
         
         # Identificar estruturas gramaticais
-        if any(word in text_lower for word in ["is", "are", "was", "were", "am"]):
-            focus_areas.append("be_verb")
-        
-        if any(word in text_lower for word in ["have", "has", "had"]):
-            focus_areas.append("have_verb")
+        # (palavras inteiras, não substrings: "a" não casa com "cat")
+        for focus_area, keywords in GRAMMATICAL_FOCUS_KEYWORDS:
+            if not tokens.isdisjoint(keywords):
+                focus_areas.append(focus_area)
         
-        if any(word in text_lower for word in ["will", "would", "can", "could", "should", "must"]):
-            focus_areas.append("modal_verbs")
-        
-        if any(word in text_lower for word in ["the", "a", "an"]):
-            focus_areas.append("articles")
-        
-        if "?" in sentence_text:
+        if "?" in text_lower:
             focus_areas.append("question_formation")
         
-        if "not" in text_lower or "n't" in text_lower:
+        if "not" in tokens or "n't" in text_lower:
             focus_areas.append("negation")
         
         # Se não identificou nenhum foco específico
@@ -2010,35 +2987,25 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         
         return focus_areas
     
-    def _determine_communicative_function(self, sentence_text: str) -> str:
-        """Determinar função comunicativa da sentence."""
-        
-        text_lower = sentence_text.lower()
+    def _determine_communicative_function(self, text_lower: str) -> str:
+        """Determinar função comunicativa da sentence (texto já em minúsculas)."""
         
         # Identificar função baseada em padrões
-        if "?" in sentence_text:
-            if any(word in text_lower for word in ["what", "where", "when", "why", "how", "who"]):
+        if "?" in text_lower:
+            if _QUESTION_WORD_RE.search(text_lower):
                 return "asking_information"
             else:
                 return "asking_confirmation"
         
-        elif "!" in sentence_text:
+        elif "!" in text_lower:
             return "expressing_emotion"
         
-        elif any(phrase in text_lower for phrase in ["please", "could you", "would you", "can you"]):
-            return "making_request"
-        
-        elif any(phrase in text_lower for phrase in ["hello", "hi", "good morning", "good afternoon"]):
-            return "greeting"
-        
-        elif any(phrase in text_lower for phrase in ["thank you", "thanks", "goodbye", "bye"]):
-            return "social_formula"
-        
-        elif any(word in text_lower for word in ["think", "believe", "feel", "opinion"]):
-            return "expressing_opinion"
+        # Uma busca por função, na ordem de prioridade
+        for function, phrase_re in _COMMUNICATIVE_FUNCTION_MATCHERS:
+            if phrase_re.search(text_lower):
+                return function
         
-        else:
-            return "giving_information"
+        return "giving_information"
     
     # =============================================================================
     # HELPER METHODS - ANÁLISE DE PROGRESSÃO
@@ -2074,12 +3041,11 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         """Calcular potencial de conectividade entre vocabulários."""
         
         # Identificar palavras que facilitam conexões
-        connective_words = []
-        for word in vocabulary_words:
-            word_lower = word.lower()
-            # Palavras que naturalmente se conectam com outras
-            if any(pattern in word_lower for pattern in ["with", "for", "and", "or", "but", "because"]):
-                connective_words.append(word)
+        # Palavras que naturalmente se conectam com outras (uma busca por palavra)
+        connective_words = [
+            word for word in vocabulary_words
+            if _CONNECTIVE_WORD_RE.search(word.lower())
+        ]
         
         # Calcular potencial de combinações
         combination_potential = len(vocabulary_words) * len(taught_vocabulary)
@@ -2094,30 +3060,17 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     def _evaluate_progression_adequacy(self, sequence_order: int, new_vocabulary_ratio: float) -> str:
         """Avaliar adequação da progressão."""
         
-        # Definir intervalos esperados por sequência
-        if sequence_order <= 2:
-            if new_vocabulary_ratio >= 0.8:
-                return "excellent"
-            elif new_vocabulary_ratio >= 0.6:
-                return "good"
-            else:
-                return "needs_more_new_vocabulary"
+        # Faixa da sequência e intervalos (inclusivos) esperados, em ordem de veredito
+        band = next(
+            band for band in PROGRESSION_ADEQUACY_BANDS if sequence_order <= band[0]
+        )
+        _, ranges, default_verdict = band
         
-        elif sequence_order <= 5:
-            if 0.4 <= new_vocabulary_ratio <= 0.7:
-                return "excellent"
-            elif 0.3 <= new_vocabulary_ratio <= 0.8:
-                return "good"
-            else:
-                return "needs_balance_adjustment"
+        for low, high, verdict in ranges:
+            if low <= new_vocabulary_ratio <= high:
+                return verdict
         
-        else:  # sequence_order > 5
-            if new_vocabulary_ratio <= 0.4:
-                return "excellent"
-            elif new_vocabulary_ratio <= 0.6:
-                return "good"
-            else:
-                return "too_much_new_vocabulary"
+        return default_verdict
     
     # =============================================================================
     # HELPER METHODS - FALLBACKS E RECUPERAÇÃO
@@ -2140,19 +3093,13 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         # Templates baseados no nível CEFR
         templates = self._get_cefr_sentence_templates(cefr_level, unit_context)
         
-        # Gerar sentences usando templates
-        fallback_sentences = []
-        for i in range(min(target_count, 15)):
-            template = templates[i % len(templates)]
-            
-            # Selecionar palavras para esta sentence
-            sentence_words = vocabulary_words[i:i+2] if i < len(vocabulary_words) else vocabulary_words[:2]
-            
-            # Gerar sentence usando template
-            sentence_text = self._apply_template(template, sentence_words, unit_context)
-            
-            fallback_sentences.append({
-                "text": sentence_text,
+        # Gerar sentences usando templates (em ciclo); cada sentence usa a janela de
+        # 2 palavras a partir do seu índice, ou as 2 primeiras quando o vocabulário
+        # acabou
+        apply_template = self._apply_template
+        fallback_sentences = [
+            {
+                "text": apply_template(template, sentence_words, unit_context),
                 "vocabulary_used": sentence_words,
                 "context_situation": f"fallback_context_{i+1}",
                 "complexity_level": template["complexity"],
@@ -2161,7 +3108,10 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
                 "phonetic_features": [],
                 "pronunciation_notes": None,
                 "communicative_function": template["function"]
-            })
+            }
+            for i, template in zip(range(min(target_count, 15)), cycle(templates))
+            for sentence_words in (vocabulary_words[i:i + 2] or vocabulary_words[:2],)
+        ]
         
         return {
             "sentences": fallback_sentences,
@@ -2171,56 +3121,21 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             "fallback_used": True
         }
     
-    def _get_cefr_sentence_templates(self, cefr_level: str, unit_context: str) -> List[Dict[str, Any]]:
-        """Obter templates de sentences por nível CEFR."""
-        
-        templates_by_level = {
-            "A1": [
-                {"pattern": "This is a {word1}.", "complexity": "simple", "function": "description"},
-                {"pattern": "I like {word1}.", "complexity": "simple", "function": "preference"},
-                {"pattern": "The {word1} is {word2}.", "complexity": "simple", "function": "description"},
-                {"pattern": "I have a {word1}.", "complexity": "simple", "function": "possession"},
-                {"pattern": "Where is the {word1}?", "complexity": "simple", "function": "asking_location"}
-            ],
-            "A2": [
-                {"pattern": "I would like to {word1} a {word2}.", "complexity": "intermediate", "function": "making_request"},
-                {"pattern": "The {word1} is very {word2}.", "complexity": "intermediate", "function": "description"},
-                {"pattern": "Can you help me with the {word1}?", "complexity": "intermediate", "function": "asking_help"},
-                {"pattern": "I need to {word1} before {word2}.", "complexity": "intermediate", "function": "expressing_necessity"},
-                {"pattern": "This {word1} looks {word2}.", "complexity": "intermediate", "function": "observation"}
-            ],
-            "B1": [
-                {"pattern": "I'm interested in {word1} because it's {word2}.", "complexity": "complex", "function": "expressing_interest"},
-                {"pattern": "Although the {word1} is {word2}, I still like it.", "complexity": "complex", "function": "contrasting"},
-                {"pattern": "If you {word1} the {word2}, it will be better.", "complexity": "complex", "function": "giving_advice"},
-                {"pattern": "The {word1} that we discussed is {word2}.", "complexity": "complex", "function": "referring"},
-                {"pattern": "I've been {word1} for this {word2} all week.", "complexity": "complex", "function": "describing_duration"}
-            ]
-        }
-        
-        # Adaptar templates ao contexto
-        base_templates = templates_by_level.get(cefr_level, templates_by_level["A2"])
-        
-        # Se há contexto específico, adaptar alguns templates
-        if "hotel" in unit_context.lower():
-            base_templates.append({"pattern": "I'd like to book a {word1} for {word2}.", "complexity": "intermediate", "function": "booking"})
-        
-        return base_templates
+    def _get_cefr_sentence_templates(
+        self, cefr_level: str, unit_context: str
+    ) -> Tuple[Dict[str, str], ...]:
+        """Obter templates de sentences por nível CEFR, adaptados ao contexto."""
+        return _fallback_sentence_templates(cefr_level, "hotel" in unit_context.lower())
     
     def _apply_template(self, template: Dict[str, Any], words: List[str], context: str) -> str:
         """Aplicar template para gerar sentence."""
         
-        pattern = template["pattern"]
-        
-        # Substituir placeholders com palavras
+        # Substituir placeholders em uma única passada; word2 ausente vira "good"
+        placeholders = _TemplateWords(word1=words[0] if words else "example")
         if len(words) >= 2:
-            sentence = pattern.replace("{word1}", words[0]).replace("{word2}", words[1])
-        elif len(words) == 1:
-            sentence = pattern.replace("{word1}", words[0]).replace("{word2}", "good")
-        else:
-            sentence = pattern.replace("{word1}", "example").replace("{word2}", "good")
+            placeholders["word2"] = words[1]
         
-        return sentence
+        return template["pattern"].format_map(placeholders)
     
     def _generate_minimal_fallback(self) -> Dict[str, Any]:
         """Gerar fallback mínimo quando não há dados suficientes."""
@@ -2263,18 +3178,21 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     def _recalculate_vocabulary_coverage(self, sentences: List[Dict[str, Any]], vocabulary_data: Dict[str, Any]) -> float:
         """Recalcular cobertura de vocabulário após ajustes."""
         
-        vocabulary_items = vocabulary_data.get("items", [])
-        target_words = set(item.get("word", "").lower() for item in vocabulary_items)
-        
-        used_words = set()
-        for sentence in sentences:
-            vocabulary_used = sentence.get("vocabulary_used", [])
-            used_words.update(word.lower() for word in vocabulary_used)
+        target_words = {
+            item.get("word", "").lower() for item in vocabulary_data.get("items", [])
+        }
         
         if not target_words:
             return 0.8  # Score padrão
         
-        return len(used_words.intersection(target_words)) / len(target_words)
+        # Uma única compreensão em vez de set.update incremental por sentence
+        used_words = {
+            word.lower()
+            for sentence in sentences
+            for word in sentence.get("vocabulary_used", ())
+        }
+
+        return len(used_words & target_words) / len(target_words)
     
     def _recalculate_contextual_coherence(self, sentences: List[Dict[str, Any]], request: SentencesGenerationRequest) -> float:
         """Recalcular coerência contextual após ajustes."""
@@ -2284,37 +3202,27 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
         if not unit_context:
             return 0.75
         
-        context_words = set(unit_context.split())
-        coherent_count = 0
-        
-        for sentence in sentences:
-            sentence_text = sentence.get("text", "").lower()
-            sentence_words = set(sentence_text.split())
-            
-            if context_words.intersection(sentence_words):
-                coherent_count += 1
+        # Conjuntos de palavras memoizados por texto; isdisjoint para no primeiro acerto
+        context_words = _text_word_set(unit_context)
+        coherent_count = sum(
+            1 for sentence in sentences
+            if not context_words.isdisjoint(_text_word_set(sentence.get("text", "")))
+        )
         
         return coherent_count / max(len(sentences), 1)
     
     def _recalculate_progression_appropriateness(self, sentences: List[Dict[str, Any]], cefr_level: str) -> float:
         """Recalcular adequação da progressão após ajustes."""
         
-        complexities = [sentence.get("complexity_level", "intermediate") for sentence in sentences]
-        
-        # Complexidades esperadas por nível
-        expected_for_level = {
-            "A1": ["simple", "very_simple"],
-            "A2": ["simple", "intermediate"],
-            "B1": ["intermediate", "complex"],
-            "B2": ["intermediate", "complex"],
-            "C1": ["complex", "sophisticated"],
-            "C2": ["sophisticated", "advanced"]
-        }
-        
-        expected = expected_for_level.get(cefr_level, ["intermediate"])
+        expected = RECALCULATION_EXPECTED_COMPLEXITIES.get(
+            cefr_level, DEFAULT_EXPECTED_COMPLEXITIES
+        )
         
-        appropriate_count = sum(1 for comp in complexities if comp in expected)
-        return appropriate_count / max(len(complexities), 1)
+        appropriate_count = sum(
+            1 for sentence in sentences
+            if sentence.get("complexity_level", "intermediate") in expected
+        )
+        return appropriate_count / max(len(sentences), 1)
 
     async def _ensure_exact_target_count(self, enriched_sentences: Dict[str, Any], target_count: int, request) -> Dict[str, Any]:
         """
@@ -2335,14 +3243,17 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
             logger.info(f"📉 Removendo {current_count - target_count} sentenças extras")
             
             # Ordenar por qualidade (complexidade, cobertura de vocabulário)
-            scored_sentences = []
-            for i, sentence in enumerate(current_sentences):
-                score = self._calculate_sentence_quality_score(sentence, request)
-                scored_sentences.append((score, i, sentence))
+            # Scores calculados em uma passada; a seleção usa apenas (score, índice)
+            quality_score = self._calculate_sentence_quality_score
+            scores = [
+                quality_score(sentence, request) for sentence in current_sentences
+            ]
             
-            # Manter as melhores
-            scored_sentences.sort(reverse=True)
-            best_sentences = [item[2] for item in scored_sentences[:target_count]]
+            # Manter as melhores (top-K via heap, sem ordenar a lista inteira)
+            best_indexes = heapq.nlargest(
+                target_count, range(current_count), key=lambda i: (scores[i], i)
+            )
+            best_sentences = [current_sentences[i] for i in best_indexes]
             
             enriched_sentences["sentences"] = best_sentences
             enriched_sentences["total_sentences"] = target_count
@@ -2366,21 +3277,27 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
                 if not available_vocab:
                     available_vocab = unit_vocab  # Reutilizar se necessário
                 
+                # Subconjuntos (janela de 2 palavras) e textos montados uma única vez,
+                # depois percorridos em ciclo até completar o necessário
+                vocab_subsets = [
+                    (subset, f"This sentence uses {' and '.join(subset)} in context.")
+                    for subset in (
+                        available_vocab[j:j + 2] for j in range(len(available_vocab))
+                    )
+                ]
+                context_situation = request.unit_data.get("context", "general context")
+
                 # Gerar sentenças simples adicionais
-                extra_sentences = []
-                for i in range(needed):
-                    vocab_subset = available_vocab[i % len(available_vocab):i % len(available_vocab) + 2]
-                    
-                    extra_sentence = {
-                        "text": f"This sentence uses {' and '.join(vocab_subset)} in context.",
-                        "vocabulary_used": vocab_subset,
-                        "complexity_level": "simple",
-                        "context_situation": request.unit_data.get("context", "general context"),
-                        "phonetic_focus": [],
-                        "pronunciation_notes": "",
-                        "generated_method": "target_count_completion"
+                extra_sentences = [
+                    {
+                        **TARGET_COUNT_COMPLETION_SENTENCE,
+                        "text": text,
+                        "vocabulary_used": list(vocab_subset),
+                        "context_situation": context_situation,
+                        "phonetic_focus": []
                     }
-                    extra_sentences.append(extra_sentence)
+                    for vocab_subset, text in islice(cycle(vocab_subsets), needed)
+                ]
                 
                 enriched_sentences["sentences"] = current_sentences + extra_sentences
                 enriched_sentences["total_sentences"] = target_count
@@ -2395,18 +3312,13 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
     
     def _calculate_sentence_quality_score(self, sentence: Dict[str, Any], request) -> float:
         """Calcular score de qualidade de uma sentença para ranking."""
-        score = 0.0
-        
         # Pontuação por vocabulário usado
-        vocab_used = len(sentence.get("vocabulary_used", []))
-        score += vocab_used * 0.3
+        score = len(sentence.get("vocabulary_used", ())) * 0.3
         
         # Pontuação por complexidade apropriada
-        complexity = sentence.get("complexity_level", "simple")
-        if complexity == "intermediate":
-            score += 0.2
-        elif complexity == "complex":
-            score += 0.15
+        score += SENTENCE_QUALITY_COMPLEXITY_BONUS.get(
+            sentence.get("complexity_level", "simple"), 0.0
+        )
         
         # Pontuação por contexto
         if sentence.get("context_situation"):
@@ -2428,19 +3340,41 @@ Return JSON: {{"sentences": [{{"text": "...", "vocabulary_used": [...], "context
 # FUNÇÃO DE CONVENIÊNCIA PARA ENDPOINTS
 # =============================================================================
 
+# Instância global do serviço
+# (LLM, encoder de tokens e cache reaproveitados entre chamadas)
+_sentences_generator_service: Optional[SentencesGeneratorService] = None
+
+
+def get_sentences_generator_service() -> SentencesGeneratorService:
+    """Obter instância global do gerador de sentences."""
+    global _sentences_generator_service
+    # Recriar se o cliente HTTP global com que o LLM foi criado já foi fechado
+    # (shutdown/reload)
+    if (
+        _sentences_generator_service is None
+        or _sentences_generator_service.llm.http_async_client.is_closed
+    ):
+        _sentences_generator_service = SentencesGeneratorService()
+    return _sentences_generator_service
+
+
 async def generate_sentences_for_unit_creation(generation_params: Dict[str, Any]) -> Dict[str, Any]:
     """
     Função de conveniência para geração de sentences em endpoints V2.
     Mantém compatibilidade com a API existente.
     """
+    # Relógio monotônico: duração imune a ajustes do relógio do sistema
+    start_ns = time.perf_counter_ns()
     try:
-        service = SentencesGeneratorService()
+        service = get_sentences_generator_service()
         sentences_section = await service.generate_sentences_for_unit(generation_params)
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
         return {
             "success": True,
-            "sentences_section": sentences_section.dict(),
-            "generation_time": time.time(),
+            "sentences_section": sentences_section.model_dump(),
+            "generation_time": elapsed_ns / 1e9,
+            "generation_time_ns": elapsed_ns,
             "service_version": "langchain_0.3_pydantic_2"
         }
         
@@ -6,13 +6,23 @@ NOVO CONCEITO: Gera gabaritos com enunciado + resposta + explicação (não corr
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import random
 import time
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import types
+from collections import OrderedDict
+from typing import (
+    Dict, List, Any, Optional, Tuple, Callable, Awaitable, Type, Union,
+    get_args, get_origin
+)
+from datetime import datetime, timezone
 
 from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
+from langchain_core.exceptions import OutputParserException
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, ValidationError
 
@@ -24,355 +34,599 @@ from src.core.unit_models import (
 )
 from src.services.prompt_generator import PromptGeneratorService
 from src.services.model_selector import get_llm_config_for_service
+from src.core.json_utils import json_dumps_bytes, json_dumps_pretty, json_loads
+from src.core.http_client import get_llm_http_client
 
 logger = logging.getLogger(__name__)
 
+# Saída do structured output tratada como confiável: monta AssessmentSolution sem
+# revalidar (opt-in; o with_structured_output usa response_format json_schema sem
+# strict=True, então a OpenAI não garante a aderência ao schema).
+# IVO_TRUSTED_LLM_OUTPUT=1 é o nome atual; IVO_SKIP_VALIDATION=true continua aceito.
+SKIP_STRUCTURED_OUTPUT_VALIDATION = (
+    os.getenv("IVO_TRUSTED_LLM_OUTPUT", "").lower() in ("1", "true")
+    or os.getenv("IVO_SKIP_VALIDATION", "false").lower() == "true"
+)
 
-class SolveAssessmentsService:
-    """Serviço principal para geração de gabaritos de assessments via IA."""
+# Erros transitórios do provedor (429, 5xx, conexão/timeout): repetidos com backoff,
+# nunca enviados ao fallback
+TRANSIENT_LLM_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+# Erros de formato da resposta: os únicos que justificam o fallback sem structured
+# output
+STRUCTURED_OUTPUT_ERRORS = (OutputParserException, ValidationError, ValueError)
+
+def _nested_model_type(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """Modelo Pydantic aninhado em uma anotação de campo: (classe ou None, é lista)."""
+    # Optional[X] / X | None: desembrulhar quando há um único tipo além de None
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _nested_model_type(args[0]) if len(args) == 1 else (None, False)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    if get_origin(annotation) in (list, List):
+        args = get_args(annotation)
+        if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            return args[0], True
+    return None, False
+
+
+def _construct_recursive(cls: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+    """
+    model_construct recursivo: sub-modelos (campos BaseModel ou List[BaseModel])
+    também são montados sem validação. Apenas para saída confiável; entrada de API
+    continua em model_validate.
+    """
+    fields = dict(data)
+    for name, field in cls.model_fields.items():
+        value = fields.get(name)
+        if value is None:
+            continue
+        nested_cls, is_list = _nested_model_type(field.annotation)
+        if nested_cls is None:
+            continue
+        if is_list and isinstance(value, list):
+            fields[name] = [
+                _construct_recursive(nested_cls, item)
+                if isinstance(item, dict) else item
+                for item in value
+            ]
+        elif not is_list and isinstance(value, dict):
+            fields[name] = _construct_recursive(nested_cls, value)
+    return cls.model_construct(**fields)
+
+
+def _enum_value(value: Any) -> Any:
+    """Valor primitivo de enums (CEFRLevel, UnitType...); demais valores inalterados."""
+    return value.value if hasattr(value, "value") else value
+
+
+def _unit_prompt_data(unit: Any) -> Dict[str, Any]:
+    """
+    Dados da unidade usados nos prompts, lendo cada atributo uma única vez.
     
-    def __init__(self):
-        """Inicializar serviço com GPT-5 e prompt generator."""
-        # Configurar LLM para geração de gabaritos (usar GPT-5)
-        self.llm_config = get_llm_config_for_service("unit_generation")  # GPT-5 config
-        self.llm = ChatOpenAI(**self.llm_config)
-        
-        # Prompt generator para carregar prompts YAML
-        self.prompt_generator = PromptGeneratorService()
-        
-        logger.info("✅ SolveAssessmentsService inicializado com GPT-5 para geração de gabaritos")
+    Substitui unit.__dict__ (todos os campos do modelo, inclusive imagens, Q&A e
+    métricas) e o dict montado à mão na correção: apenas os campos consumidos pelos
+    templates, com enums normalizados. id e updated_at alimentam a memoização do
+    PromptGeneratorService.
+    """
+    return {
+        "id": getattr(unit, "id", None),
+        "updated_at": getattr(unit, "updated_at", None),
+        "title": getattr(unit, "title", None),
+        "main_aim": getattr(unit, "main_aim", None),
+        "subsidiary_aims": getattr(unit, "subsidiary_aims", None),
+        "context": getattr(unit, "context", None),
+        "cefr_level": _enum_value(getattr(unit, "cefr_level", None)),
+        "unit_type": _enum_value(getattr(unit, "unit_type", None)),
+        "language_variant": _enum_value(getattr(unit, "language_variant", None)),
+        "vocabulary": getattr(unit, "vocabulary", None),
+        "sentences": getattr(unit, "sentences", None),
+        "tips": getattr(unit, "tips", None),
+        "grammar": getattr(unit, "grammar", None),
+        "course_id": getattr(unit, "course_id", None) or "",
+        "book_id": getattr(unit, "book_id", None) or "",
+        "course_name": getattr(unit, "course_name", None) or "",
+        "book_name": getattr(unit, "book_name", None) or ""
+    }
 
-    def _create_gabarito_schema(self) -> Dict[str, Any]:
-        """Schema para structured output da geração de gabarito."""
-        return {
-            "title": "AssessmentSolution",
-            "description": "Complete answer key and solution for an assessment",
+
+# Schema de structured output da geração de gabarito (somente leitura)
+GABARITO_SCHEMA: Dict[str, Any] = {
+    "title": "AssessmentSolution",
+    "description": "Complete answer key and solution for an assessment",
+    "type": "object",
+    "properties": {
+        "assessment_type": {"type": "string"},
+        "assessment_title": {"type": "string"},
+        "total_items": {"type": "integer", "minimum": 1},
+        "instructions": {"type": "string"},
+        "unit_context": {"type": "string"},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "item_id": {"type": "string"},
+                    "question_text": {"type": "string"},
+                    "correct_answer": {"type": "string"},
+                    "explanation": {"type": "string"},
+                    "difficulty_level": {
+                        "type": "string",
+                        "enum": ["easy", "medium", "hard"],
+                        "description": (
+                            "Difficulty level of this specific item - REQUIRED field"
+                        )
+                    },
+                    "skills_tested": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": [
+                    "item_id", "question_text", "correct_answer", "explanation",
+                    "difficulty_level"
+                ],
+                "additionalProperties": False
+            }
+        },
+        "skills_overview": {"type": "array", "items": {"type": "string"}},
+        "difficulty_distribution": {
+            "type": "object",
+            "properties": {
+                "easy": {"type": "integer", "minimum": 0},
+                "medium": {"type": "integer", "minimum": 0},
+                "hard": {"type": "integer", "minimum": 0}
+            }
+        },
+        "teaching_notes": {"type": "array", "items": {"type": "string"}},
+        "ai_model_used": {"type": "string", "default": "gpt-5"}
+    },
+    "required": [
+        "assessment_type", "assessment_title", "total_items", "instructions",
+        "unit_context", "items", "skills_overview", "teaching_notes"
+    ],
+    "additionalProperties": False
+}
+
+# Schema de structured output da correção de assessment - LEGADO (somente leitura)
+SOLVE_ASSESSMENT_SCHEMA: Dict[str, Any] = {
+    "title": "SolveAssessmentResult",
+    "description": "Schema for comprehensive assessment correction results",
+    "type": "object",
+    "properties": {
+        "total_score": {
+            "type": "integer",
+            "minimum": 0,
+            "description": "Total score earned by student"
+        },
+        "total_possible": {
+            "type": "integer",
+            "minimum": 1,
+            "description": "Total possible score"
+        },
+        "performance_level": {
+            "type": "string",
+            "enum": ["excellent", "good", "satisfactory", "needs_improvement"],
+            "description": "Overall performance level"
+        },
+        "cefr_demonstration": {
+            "type": "string",
+            "enum": ["above", "at", "below"],
+            "description": "CEFR level demonstration compared to expected"
+        },
+        "item_corrections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "item_id": {"type": "string"},
+                    "student_answer": {"type": "string"},
+                    "correct_answer": {"type": "string"},
+                    "result": {
+                        "type": "string",
+                        "enum": ["correct", "incorrect", "partially_correct"]
+                    },
+                    "score_earned": {"type": "integer", "minimum": 0},
+                    "score_total": {"type": "integer", "minimum": 1},
+                    "feedback": {"type": "string"},
+                    "l1_interference": {"type": "string", "nullable": True}
+                },
+                "required": [
+                    "item_id", "student_answer", "correct_answer", "result",
+                    "score_earned", "score_total", "feedback"
+                ],
+                "additionalProperties": False
+            },
+            "description": "Individual item corrections"
+        },
+        "error_analysis": {
             "type": "object",
             "properties": {
-                "assessment_type": {"type": "string"},
-                "assessment_title": {"type": "string"},
-                "total_items": {"type": "integer", "minimum": 1},
-                "instructions": {"type": "string"},
-                "unit_context": {"type": "string"},
-                "items": {
+                "most_common_errors": {
                     "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "item_id": {"type": "string"},
-                            "question_text": {"type": "string"},
-                            "correct_answer": {"type": "string"},
-                            "explanation": {"type": "string"},
-                            "difficulty_level": {
-                                "type": "string", 
-                                "enum": ["easy", "medium", "hard"],
-                                "description": "Difficulty level of this specific item - REQUIRED field"
-                            },
-                            "skills_tested": {"type": "array", "items": {"type": "string"}}
-                        },
-                        "required": ["item_id", "question_text", "correct_answer", "explanation", "difficulty_level"],
-                        "additionalProperties": False
-                    }
+                    "items": {"type": "string"},
+                    "description": "Most frequent error types"
                 },
-                "skills_overview": {"type": "array", "items": {"type": "string"}},
-                "difficulty_distribution": {
-                    "type": "object",
-                    "properties": {
-                        "easy": {"type": "integer", "minimum": 0},
-                        "medium": {"type": "integer", "minimum": 0}, 
-                        "hard": {"type": "integer", "minimum": 0}
-                    }
+                "l1_interference_patterns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Portuguese to English interference patterns"
+                },
+                "recurring_mistakes": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Mistakes that repeat across items"
                 },
-                "teaching_notes": {"type": "array", "items": {"type": "string"}},
-                "ai_model_used": {"type": "string", "default": "gpt-5"}
+                "error_frequency": {
+                    "type": "object",
+                    "additionalProperties": {"type": "integer"},
+                    "description": "Frequency count of each error type"
+                }
             },
             "required": [
-                "assessment_type", "assessment_title", "total_items", "instructions", 
-                "unit_context", "items", "skills_overview", "teaching_notes"
+                "most_common_errors", "l1_interference_patterns", "recurring_mistakes",
+                "error_frequency"
             ],
             "additionalProperties": False
-        }
-
-    def _create_solve_assessment_schema(self) -> Dict[str, Any]:
-        """Schema para structured output da correção de assessment (LEGADO)."""
-        return {
-            "title": "SolveAssessmentResult",
-            "description": "Schema for comprehensive assessment correction results",
+        },
+        "constructive_feedback": {
             "type": "object",
             "properties": {
-                "total_score": {
-                    "type": "integer",
-                    "minimum": 0,
-                    "description": "Total score earned by student"
-                },
-                "total_possible": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "description": "Total possible score"
-                },
-                "performance_level": {
-                    "type": "string",
-                    "enum": ["excellent", "good", "satisfactory", "needs_improvement"],
-                    "description": "Overall performance level"
-                },
-                "cefr_demonstration": {
-                    "type": "string",
-                    "enum": ["above", "at", "below"],
-                    "description": "CEFR level demonstration compared to expected"
-                },
-                "item_corrections": {
+                "strengths_demonstrated": {
                     "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "item_id": {"type": "string"},
-                            "student_answer": {"type": "string"},
-                            "correct_answer": {"type": "string"},
-                            "result": {
-                                "type": "string",
-                                "enum": ["correct", "incorrect", "partially_correct"]
-                            },
-                            "score_earned": {"type": "integer", "minimum": 0},
-                            "score_total": {"type": "integer", "minimum": 1},
-                            "feedback": {"type": "string"},
-                            "l1_interference": {"type": "string", "nullable": True}
-                        },
-                        "required": ["item_id", "student_answer", "correct_answer", "result", "score_earned", "score_total", "feedback"],
-                        "additionalProperties": False
-                    },
-                    "description": "Individual item corrections"
+                    "items": {"type": "string"},
+                    "description": "Positive aspects identified"
                 },
-                "error_analysis": {
-                    "type": "object",
-                    "properties": {
-                        "most_common_errors": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Most frequent error types"
-                        },
-                        "l1_interference_patterns": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Portuguese to English interference patterns"
-                        },
-                        "recurring_mistakes": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Mistakes that repeat across items"
-                        },
-                        "error_frequency": {
-                            "type": "object",
-                            "additionalProperties": {"type": "integer"},
-                            "description": "Frequency count of each error type"
-                        }
-                    },
-                    "required": ["most_common_errors", "l1_interference_patterns", "recurring_mistakes", "error_frequency"],
-                    "additionalProperties": False
+                "areas_for_improvement": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Specific areas needing work"
                 },
-                "constructive_feedback": {
-                    "type": "object",
-                    "properties": {
-                        "strengths_demonstrated": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Positive aspects identified"
-                        },
-                        "areas_for_improvement": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Specific areas needing work"
-                        },
-                        "study_recommendations": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Targeted study suggestions"
-                        },
-                        "next_steps": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Next learning steps"
-                        }
-                    },
-                    "required": ["strengths_demonstrated", "areas_for_improvement", "study_recommendations", "next_steps"],
-                    "additionalProperties": False
+                "study_recommendations": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Targeted study suggestions"
                 },
-                "pedagogical_notes": {
-                    "type": "object",
-                    "properties": {
-                        "class_performance_patterns": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Patterns observed for class teaching"
-                        },
-                        "remedial_activities": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Suggested remedial activities"
-                        },
-                        "differentiation_needed": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Necessary adaptations"
-                        },
-                        "followup_assessments": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Follow-up assessment ideas"
-                        }
-                    },
-                    "required": ["class_performance_patterns", "remedial_activities", "differentiation_needed", "followup_assessments"],
-                    "additionalProperties": False
+                "next_steps": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Next learning steps"
+                }
+            },
+            "required": [
+                "strengths_demonstrated", "areas_for_improvement",
+                "study_recommendations", "next_steps"
+            ],
+            "additionalProperties": False
+        },
+        "pedagogical_notes": {
+            "type": "object",
+            "properties": {
+                "class_performance_patterns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Patterns observed for class teaching"
                 },
-                "assessment_type": {"type": "string"},
-                "assessment_title": {"type": "string"},
-                "unit_context": {
-                    "type": "object",
-                    "additionalProperties": True,
-                    "description": "Unit context information"
+                "remedial_activities": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Suggested remedial activities"
                 },
-                "accuracy_percentage": {
-                    "type": "number",
-                    "minimum": 0.0,
-                    "maximum": 100.0,
-                    "description": "Percentage of correct answers"
+                "differentiation_needed": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Necessary adaptations"
                 },
-                "ai_model_used": {"type": "string", "default": "gpt-5"}
+                "followup_assessments": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Follow-up assessment ideas"
+                }
             },
             "required": [
-                "total_score", "total_possible", "performance_level", "cefr_demonstration",
-                "item_corrections", "error_analysis", "constructive_feedback", "pedagogical_notes",
-                "assessment_type", "assessment_title", "accuracy_percentage"
+                "class_performance_patterns", "remedial_activities",
+                "differentiation_needed", "followup_assessments"
             ],
             "additionalProperties": False
+        },
+        "assessment_type": {"type": "string"},
+        "assessment_title": {"type": "string"},
+        "unit_context": {
+            "type": "object",
+            "additionalProperties": True,
+            "description": "Unit context information"
+        },
+        "accuracy_percentage": {
+            "type": "number",
+            "minimum": 0.0,
+            "maximum": 100.0,
+            "description": "Percentage of correct answers"
+        },
+        "ai_model_used": {"type": "string", "default": "gpt-5"}
+    },
+    "required": [
+        "total_score", "total_possible", "performance_level", "cefr_demonstration",
+        "item_corrections", "error_analysis", "constructive_feedback",
+        "pedagogical_notes", "assessment_type", "assessment_title",
+        "accuracy_percentage"
+    ],
+    "additionalProperties": False
+}
+
+
+# Batch API da OpenAI (geração offline de gabaritos em massa, ~50% do custo)
+GABARITO_BATCH_ENDPOINT = "/v1/chat/completions"
+GABARITO_BATCH_COMPLETION_WINDOW = "24h"
+GABARITO_BATCH_TERMINAL_STATUSES = frozenset(
+    {"completed", "failed", "expired", "cancelled"}
+)
+GABARITO_BATCH_MIN_POLL_INTERVAL = 5.0  # segundos; dobra a cada consulta
+GABARITO_BATCH_MAX_POLL_INTERVAL = 300.0
+
+# Modos de geração do gabarito: streaming interativo ou Batch API
+# (offline, ~50% do custo)
+GABARITO_SOLVE_MODES = frozenset({"stream", "batch"})
+# Espera máxima de generate_gabarito(solve_mode="batch"); esperas sem limite (até a
+# janela de 24h) ficam com queue_batch_gabaritos + collect_batch_gabaritos
+GABARITO_BATCH_INTERACTIVE_TIMEOUT = float(
+    os.getenv("IVO_GABARITO_BATCH_TIMEOUT", "900")
+)
+
+# Mesmo response_format que with_structured_output(GABARITO_SCHEMA) envia no caminho
+# ao vivo (method="json_schema", padrão do langchain-openai 0.3; title/description
+# viram name/description)
+GABARITO_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": GABARITO_SCHEMA["title"],
+        "description": GABARITO_SCHEMA["description"],
+        "schema": {
+            k: v for k, v in GABARITO_SCHEMA.items()
+            if k not in ("title", "description")
         }
+    }
+}
 
-    async def generate_gabarito(
-        self,
-        unit: Any,  # Objeto Unit completo
-        assessment_type: str,
-        include_explanations: bool = True,
-        difficulty_analysis: bool = True
-    ) -> AssessmentSolution:
-        """
-        Gerar gabarito completo para assessment - NOVA FUNCIONALIDADE.
+# Papéis OpenAI das mensagens LangChain (message.type -> role)
+_OPENAI_MESSAGE_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+# =============================================================================
+# PROMPTS DE FALLBACK (usados quando o template YAML falha), compilados uma vez
+# =============================================================================
+
+CORRECTION_FALLBACK_SYSTEM_PROMPT = """You are an expert English teacher correcting student assessments.
+        Provide detailed, constructive feedback focusing on learning improvement."""
+
+_format_correction_fallback_prompt = """
+        UNIT: {unit_name} ({cefr_level})
+        ASSESSMENT: {assessment_type} - {assessment_title}
         
-        Args:
-            unit: Objeto Unit completo do banco
-            assessment_type: Tipo específico de assessment 
-            include_explanations: Incluir explicações detalhadas
-            difficulty_analysis: Incluir análise de dificuldade
+        STUDENT ANSWERS: {student_answers}
+        CORRECT ANSWERS: {correct_answers}
+
+        Please provide a comprehensive correction with scoring, feedback, and recommendations.
+        """.format
+
+_format_simplified_correction_fallback_prompt = """
+            CORRECTION TASK:
+            - Assessment Type: {assessment_type}
+            - Unit: {unit_title}
+            - Level: {cefr_level}
             
-        Returns:
-            AssessmentSolution: Gabarito completo com enunciado + resposta + explicação
+            Raw Assessment Data: {assessment_data}
+            Student Answers: {student_answers}
+
+            Please provide structured correction with scores, feedback, and analysis.
+            """.format
+
+GABARITO_FALLBACK_SYSTEM_PROMPT = """You are an expert English teacher creating answer keys for assessments.
+        Generate complete solutions with detailed explanations for each item.
+
+        CRITICAL: Each item MUST include:
+        - item_id: unique identifier (string)
+        - question_text: the complete question
+        - correct_answer: the accurate solution
+        - explanation: detailed pedagogical explanation
+        - difficulty_level: MUST be "easy", "medium", or "hard" (REQUIRED)
+        - skills_tested: array of skills being evaluated
         """
-        start_time = time.time()
+
+_format_gabarito_fallback_prompt = """Generate a complete answer key for this {assessment_type} assessment:
         
-        logger.info(f"🎯 Gerando gabarito para {assessment_type} via GPT-5")
+        Unit Context: {unit_context}
+        Assessment Data: {assessment_data}
         
+        IMPORTANT: Every single item must have a difficulty_level field set to "easy", "medium", or "hard".""".format
+
+
+# Decoder reutilizado para extrair objetos JSON embutidos em texto livre
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_first_json_object(content: str) -> Optional[Dict[str, Any]]:
+    """Primeiro objeto JSON válido no texto (raw_decode a cada '{'), ou None."""
+    start = content.find("{")
+    while start != -1:
         try:
-            # 1. Extrair assessment específico do JSONB
-            target_assessment = self._extract_target_assessment(unit.assessments, assessment_type)
-            
-            # 2. Gerar prompt para gabarito
-            gabarito_prompt = await self._generate_gabarito_prompt(
-                unit=unit,
-                target_assessment=target_assessment,
-                assessment_type=assessment_type,
-                include_explanations=include_explanations,
-                difficulty_analysis=difficulty_analysis
-            )
-            
-            # 3. Geração via GPT-5 com structured output
-            gabarito_result = await self._generate_with_structured_output(gabarito_prompt)
-            
-            # 4. Construir resultado final
-            processing_time = time.time() - start_time
-            
-            result = AssessmentSolution(
-                **gabarito_result,
-                solution_timestamp=datetime.now(),
-                processing_time=processing_time
-            )
-            
-            logger.info(f"✅ Gabarito gerado em {processing_time:.2f}s - {result.total_items} items resolvidos")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Erro na geração de gabarito: {str(e)}")
-            raise
+            obj, _ = _JSON_DECODER.raw_decode(content, start)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        start = content.find("{", start + 1)
+    return None
+
+# Instâncias ChatOpenAI compartilhadas por configuração de serviço
+# (mesmo pool HTTP keep-alive)
+_LLM_INSTANCES: Dict[str, ChatOpenAI] = {}
+
+
+def _get_llm(service_name: str, llm_config: Dict[str, Any]) -> ChatOpenAI:
+    """
+    Obter ChatOpenAI compartilhado para o serviço, usando o cliente HTTP global.
+
+    A instância vive enquanto o cliente HTTP com que foi criada estiver aberto.
+
+    max_retries=0: as novas tentativas ficam só com _with_transient_retry do serviço;
+    somadas às do SDK, cada chamada lógica poderia virar até 12 requests em um outage.
+    """
+    llm = _LLM_INSTANCES.get(service_name)
+    # Recriar quando o cliente HTTP global foi fechado
+    # (shutdown do lifespan, reload, TestClient)
+    if llm is None or llm.http_async_client is None or llm.http_async_client.is_closed:
+        llm = ChatOpenAI(
+            **{**llm_config, "max_retries": 0},
+            http_async_client=get_llm_http_client()
+        )
+        _LLM_INSTANCES[service_name] = llm
+    return llm
+
+
+class SolveAssessmentsService:
+    """Serviço principal para geração de gabaritos de assessments via IA."""
+
+    def __init__(self):
+        """Inicializar serviço com GPT-5 e prompt generator."""
+        # Configurar LLM para geração de gabaritos (usar GPT-5)
+        self.llm_config = get_llm_config_for_service("unit_generation")  # GPT-5 config
+
+        # Runnables de structured output montados uma vez por instância de LLM
+        # (conversão do schema não se repete por request); recriados junto com o LLM
+        # se o cliente HTTP for fechado
+        self._structured_runnables: Dict[str, Tuple[ChatOpenAI, Any]] = {}
+        self._openai_client_instance: Optional[AsyncOpenAI] = None
+
+        # Prompt generator para carregar prompts YAML
+        self.prompt_generator = PromptGeneratorService()
+
+        # Cache de respostas (LRU com TTL) para regenerações idênticas do mesmo
+        # gabarito/correção
+        self._response_cache: "OrderedDict[str, Tuple[float, BaseModel]]" = (
+            OrderedDict()
+        )
+        self._max_response_cache_size = 128
+        self._response_cache_ttl = 86400  # 24 horas
+
+        # Limite de gabaritos gerados em paralelo (chamadas LLM simultâneas)
+        # em generate_all_gabaritos
+        self._gabarito_semaphore = asyncio.Semaphore(
+            int(os.getenv("IVO_GABARITO_CONCURRENCY", "8"))
+        )
+
+        # Orçamento de novas tentativas em erros transitórios
+        # (backoff exponencial com jitter, teto em segundos)
+        self._llm_transient_retries = 2
+        self._llm_backoff_cap = 30.0
+
+        logger.info(
+            "✅ SolveAssessmentsService inicializado com GPT-5 "
+            "para geração de gabaritos"
+        )
 
-    async def _generate_gabarito_prompt(
+    def _response_cache_key(
         self,
+        prefix: str,
         unit: Any,
         target_assessment: Dict[str, Any],
-        assessment_type: str,
-        include_explanations: bool = True,
-        difficulty_analysis: bool = True
+        *parts: Any
     ) -> str:
-        """Gerar prompt para gabarito usando novo template."""
-        try:
-            # Dados da unidade para contexto
-            unit_context_data = {
-                "course_name": getattr(unit, 'course_id', ''),
-                "book_name": getattr(unit, 'book_id', ''),
-                "unit_title": getattr(unit, 'title', ''),
-                "unit_id": unit.id,
-                "cefr_level": unit.cefr_level.value if hasattr(unit.cefr_level, 'value') else str(unit.cefr_level),
-                "unit_type": unit.unit_type.value if hasattr(unit.unit_type, 'value') else str(unit.unit_type),
-                "unit_context": getattr(unit, 'context', ''),
-                "main_aim": getattr(unit, 'main_aim', ''),
-                "subsidiary_aims": getattr(unit, 'subsidiary_aims', []),
-                "vocabulary_data": unit.vocabulary or {},
-                "sentences_data": unit.sentences or {},
-                "tips_data": unit.tips or {},
-                "grammar_data": unit.grammar or {},
-                "assessment_type": assessment_type,
-                "assessment_title": target_assessment.get('title', ''),
-                "assessment_instructions": target_assessment.get('instructions', ''),
-                "assessment_content": target_assessment.get('content', {})
-            }
-            
-            # Usar o prompt generator para carregar o template de gabarito
-            prompt = await self.prompt_generator.generate_gabarito_prompt(**unit_context_data)
-            
-            return prompt
-            
-        except Exception as e:
-            logger.error(f"Erro ao gerar prompt de gabarito: {e}")
-            # Fallback simples
-            return f"""
-            GERAÇÃO DE GABARITO:
-            - Assessment: {assessment_type}
-            - Unidade: {unit.title if hasattr(unit, 'title') else 'N/A'}
-            - Nível: {unit.cefr_level}
-            
-            Dados do Assessment: {json.dumps(target_assessment, indent=2)}
-            
-            Por favor, gere um gabarito completo com enunciado, respostas corretas e explicações detalhadas.
-            """
+        """
+        Chave de cache da resposta: hash do que entra no prompt (conteúdo da unidade +
+        assessment) e dos parâmetros da chamada.
 
-    async def _generate_with_structured_output(self, prompt: str) -> Dict[str, Any]:
-        """Executar geração de gabarito com structured output."""
-        try:
-            # Usar structured output para garantir formato JSON
-            schema = self._create_gabarito_schema()
-            structured_llm = self.llm.with_structured_output(schema)
-            
-            logger.info("🤖 Gerando gabarito via GPT-5 com structured output...")
-            
-            result = await structured_llm.ainvoke([
-                SystemMessage(content="You are an expert assessment solver generating complete answer keys."),
-                HumanMessage(content=prompt)
-            ])
-            
-            logger.info("✅ Gabarito GPT-5 gerado com structured output")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Erro na geração com structured output: {e}")
-            raise
+        updated_at fica de fora: salvar o gabarito (solve_assessments) atualiza o
+        timestamp da unidade sem mudar o prompt, o que invalidaria a chave a cada
+        request.
+        """
+        unit_content = {
+            name: (
+                value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+            )
+            for name, value in _unit_prompt_data(unit).items()
+            if name != "updated_at"
+        }
+        key_payload = [unit_content, target_assessment, *parts]
+        return f"{prefix}:" + hashlib.blake2b(
+            json_dumps_bytes(key_payload, sort_keys=True), digest_size=16
+        ).hexdigest()
+
+    def _get_cached_response(
+        self,
+        cache_key: str,
+        update: Optional[Dict[str, Any]] = None
+    ) -> Optional[BaseModel]:
+        """
+        Obter resposta do cache se ainda válida (renova posição LRU).
+
+        update: campos da resposta atual (timestamp e tempo de processamento)
+        sobrescritos na cópia, para o hit não reportar os metadados da chamada original.
+        """
+        cached = self._response_cache.get(cache_key)
+        if cached is None:
+            return None
+
+        expiry_time, result = cached
+        if time.time() >= expiry_time:
+            del self._response_cache[cache_key]
+            return None
+
+        self._response_cache.move_to_end(cache_key)
+        return result.model_copy(deep=True, update=update)
+
+    def _save_cached_response(self, cache_key: str, result: BaseModel) -> None:
+        """Salvar resposta no cache, descartando a menos recente quando cheio."""
+        expiry_time = time.time() + self._response_cache_ttl
+        self._response_cache[cache_key] = (expiry_time, result)
+        self._response_cache.move_to_end(cache_key)
+        while len(self._response_cache) > self._max_response_cache_size:
+            self._response_cache.popitem(last=False)
+
+    def _build_gabarito_solution(
+        self, gabarito_result: Dict[str, Any]
+    ) -> AssessmentSolution:
+        """
+        Construir AssessmentSolution a partir da saída do LLM.
+
+        Com IVO_TRUSTED_LLM_OUTPUT=1 o schema do structured output é a fronteira de
+        confiança e o modelo é montado via model_construct recursivo (itens inclusive),
+        sem revalidação Pydantic.
+        """
+        if not SKIP_STRUCTURED_OUTPUT_VALIDATION:
+            return AssessmentSolution.model_validate(gabarito_result)
+
+        return _construct_recursive(AssessmentSolution, gabarito_result)
+
+    def _create_gabarito_schema(self) -> Dict[str, Any]:
+        """Schema para structured output da geração de gabarito."""
+        return GABARITO_SCHEMA
+
+    def _create_solve_assessment_schema(self) -> Dict[str, Any]:
+        """Schema para structured output da correção de assessment (LEGADO)."""
+        return SOLVE_ASSESSMENT_SCHEMA
+
+    @property
+    def llm(self) -> ChatOpenAI:
+        """ChatOpenAI compartilhado do serviço (vinculado ao cliente HTTP global)."""
+        return _get_llm("unit_generation", self.llm_config)
+
+    def _get_structured_runnable(self, name: str, schema: Dict[str, Any]) -> Any:
+        """Runnable with_structured_output do schema, reaproveitado com o mesmo LLM."""
+        llm = self.llm
+        cached = self._structured_runnables.get(name)
+        if cached is None or cached[0] is not llm:
+            cached = (llm, llm.with_structured_output(schema))
+            self._structured_runnables[name] = cached
+        return cached[1]
+
+    @property
+    def _structured_gabarito_llm(self) -> Any:
+        """Runnable de geração de gabarito."""
+        return self._get_structured_runnable("gabarito", self._create_gabarito_schema())
+
+    @property
+    def _structured_solve_llm(self) -> Any:
+        """Runnable de correção (LEGADO), montado apenas na primeira correção."""
+        return self._get_structured_runnable(
+            "solve", self._create_solve_assessment_schema()
+        )
 
     async def solve_assessment_simplified(
         self, 
@@ -393,14 +647,28 @@ class SolveAssessmentsService:
         Returns:
             SolveAssessmentResult: Resultado estruturado da correção
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         logger.info(f"🔍 Correção SIMPLIFICADA de {assessment_type} via GPT-5 (dados crus)")
         
+        # 1. Extrair assessment específico do JSONB (também compõe a chave de cache)
+        target_assessment = self._extract_target_assessment(
+            unit.assessments, assessment_type
+        )
+
+        cache_key = self._response_cache_key(
+            "solve", unit, target_assessment, assessment_type,
+            student_answers or {}, student_context or ""
+        )
+        cached_result = self._get_cached_response(cache_key, update={
+            "correction_timestamp": datetime.now(timezone.utc),
+            "completion_time": time.perf_counter() - start_time
+        })
+        if cached_result is not None:
+            logger.info(f"📦 Correção de {assessment_type} reutilizada do cache")
+            return cached_result
+
         try:
-            # 1. Extrair assessment específico do JSONB
-            target_assessment = self._extract_target_assessment(unit.assessments, assessment_type)
-            
             # 2. Gerar prompt SIMPLIFICADO - IA processa dados complexos
             correction_prompt = await self._generate_simplified_prompt(
                 unit=unit,
@@ -414,14 +682,18 @@ class SolveAssessmentsService:
             correction_result = await self._correct_with_structured_output(correction_prompt)
             
             # 4. Construir resultado final
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             
             result = SolveAssessmentResult(
                 **correction_result,
-                correction_timestamp=datetime.now(),
+                correction_timestamp=datetime.now(timezone.utc),
                 completion_time=processing_time
             )
             
+            # Resultado básico de erro (fallback) não entra no cache
+            if correction_result.get("ai_model_used") != "fallback":
+                self._save_cached_response(cache_key, result)
+
             logger.info(f"✅ Correção concluída em {processing_time:.2f}s - Score: {result.total_score}/{result.total_possible}")
             
             return result
@@ -485,16 +757,26 @@ class SolveAssessmentsService:
                 
         return objectives
 
+    def _get_assessment_type_index(self, assessments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Índice tipo -> atividade do blob de assessments (no máximo 7 por unidade).
+
+        Montado a cada chamada: cachear por identidade do blob não detecta edições
+        in-place e mantém JSONBs inteiros vivos na memória.
+        """
+        index: Dict[str, Any] = {}
+        for activity in assessments.get("activities", []):
+            # setdefault mantém a primeira atividade de cada tipo
+            # (mesma semântica da busca linear)
+            index.setdefault(activity.get("type"), activity)
+        return index
+
     def _extract_assessment_info(self, assessment_data: Dict[str, Any], assessment_type: str) -> Dict[str, Any]:
         """Extrair informações do assessment a ser corrigido."""
-        # Buscar o assessment específico nas atividades
-        activities = assessment_data.get("activities", [])
-        target_activity = None
-        
-        for activity in activities:
-            if activity.get("type") == assessment_type:
-                target_activity = activity
-                break
+        # Buscar o assessment específico nas atividades (lookup O(1) no índice por tipo)
+        target_activity = self._get_assessment_type_index(assessment_data).get(
+            assessment_type
+        )
         
         if not target_activity:
             raise ValueError(f"Assessment type '{assessment_type}' not found in unit")
@@ -538,71 +820,84 @@ class SolveAssessmentsService:
         solve_request: Any
     ) -> List[Any]:
         """Prompt de fallback caso o prompt generator falhe."""
-        system_prompt = """You are an expert English teacher correcting student assessments.
-        Provide detailed, constructive feedback focusing on learning improvement."""
-        
-        user_prompt = f"""
-        UNIT: {unit_context.get('unit_name', '')} ({unit_context.get('cefr_level', 'A2')})
-        ASSESSMENT: {assessment_info.get('assessment_type', '')} - {assessment_info.get('assessment_title', '')}
-        
-        STUDENT ANSWERS: {json.dumps(solve_request.student_answers, indent=2)}
-        CORRECT ANSWERS: {json.dumps(assessment_info.get('correct_answers', {}), indent=2)}
-        
-        Please provide a comprehensive correction with scoring, feedback, and recommendations.
-        """
+        user_prompt = _format_correction_fallback_prompt(
+            unit_name=unit_context.get('unit_name', ''),
+            cefr_level=unit_context.get('cefr_level', 'A2'),
+            assessment_type=assessment_info.get('assessment_type', ''),
+            assessment_title=assessment_info.get('assessment_title', ''),
+            student_answers=json_dumps_pretty(solve_request.student_answers),
+            correct_answers=json_dumps_pretty(
+                assessment_info.get('correct_answers', {})
+            )
+        )
         
         return [
-            SystemMessage(content=system_prompt),
+            SystemMessage(content=CORRECTION_FALLBACK_SYSTEM_PROMPT),
             HumanMessage(content=user_prompt)
         ]
 
+    async def _with_transient_retry(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executar chamada LLM repetindo apenas em erros transitórios (429/5xx/conexão),
+        com backoff limitado.
+        """
+        for attempt in range(self._llm_transient_retries + 1):
+            try:
+                return await call()
+            except TRANSIENT_LLM_ERRORS as e:
+                if attempt >= self._llm_transient_retries:
+                    raise
+                delay = random.uniform(0, min(self._llm_backoff_cap, 2 ** attempt))
+                logger.warning(
+                    f"⚠️ Erro transitório da OpenAI ({type(e).__name__}), "
+                    f"nova tentativa em {delay:.1f}s "
+                    f"({attempt + 1}/{self._llm_transient_retries})"
+                )
+                await asyncio.sleep(delay)
+
     async def _correct_with_structured_output(self, prompt_messages: List[Any]) -> Dict[str, Any]:
         """Executar correção com structured output."""
         try:
             # Usar structured output para garantir formato JSON
-            schema = self._create_solve_assessment_schema()
-            structured_llm = self.llm.with_structured_output(schema)
-            
             logger.info("🤖 Corrigindo assessment via GPT-5 com structured output...")
             
-            result = await structured_llm.ainvoke(prompt_messages)
+            result = await self._with_transient_retry(
+                lambda: self._structured_solve_llm.ainvoke(prompt_messages)
+            )
+            if not isinstance(result, dict):
+                raise ValueError("Structured output não retornou um objeto de correção")
             
             logger.info("✅ Correção GPT-5 bem-sucedida com structured output")
             
             return result
             
-        except Exception as e:
+        except STRUCTURED_OUTPUT_ERRORS as e:
             logger.error(f"❌ Erro na correção com structured output: {e}")
             # Fallback sem structured output
+            # (somente para falhas de formato; erros do provedor sobem)
             return await self._correct_fallback(prompt_messages)
 
     async def _correct_fallback(self, prompt_messages: List[Any]) -> Dict[str, Any]:
         """Fallback de correção sem structured output."""
         logger.info("🔄 Usando fallback sem structured output...")
         
-        try:
-            response = await self.llm.ainvoke(prompt_messages)
-            
-            # Tentar extrair JSON da resposta
-            content = response.content
-            
-            # Buscar por JSON na resposta
-            import re
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            
-            if json_match:
-                json_str = json_match.group()
-                result = json.loads(json_str)
-                logger.info("✅ Fallback correction successful")
-                return result
-            else:
-                raise ValueError("No JSON found in fallback response")
-                
-        except Exception as fallback_error:
-            logger.error(f"❌ Fallback correction failed: {fallback_error}")
-            
-            # Último recurso: resultado básico
-            return self._create_basic_correction_result()
+        response = await self._with_transient_retry(
+            lambda: self.llm.ainvoke(prompt_messages)
+        )
+
+        # Buscar por JSON na resposta
+        # (primeiro objeto completo, ignorando texto ao redor)
+        result = _extract_first_json_object(response.content)
+
+        if result is not None:
+            logger.info("✅ Fallback correction successful")
+            return result
+
+        logger.error(
+            "❌ Fallback correction failed: No JSON found in fallback response"
+        )
+        # Último recurso: resultado básico
+        return self._create_basic_correction_result()
 
     def _create_basic_correction_result(self) -> Dict[str, Any]:
         """Criar resultado básico quando tudo falhar."""
@@ -647,10 +942,9 @@ class SolveAssessmentsService:
     def _extract_target_assessment(self, assessments: Dict[str, Any], assessment_type: str) -> Dict[str, Any]:
         """Extrair assessment específico do JSONB."""
         try:
-            activities = assessments.get("activities", [])
-            for activity in activities:
-                if activity.get("type") == assessment_type:
-                    return activity
+            activity = self._get_assessment_type_index(assessments).get(assessment_type)
+            if activity is not None:
+                return activity
             
             logger.warning(f"Assessment '{assessment_type}' não encontrado")
             return {}
@@ -670,21 +964,7 @@ class SolveAssessmentsService:
         
         try:
             # Dados crus da unidade para a IA processar
-            unit_raw_data = {
-                "id": unit.id,
-                "title": unit.title,
-                "main_aim": unit.main_aim,
-                "subsidiary_aims": unit.subsidiary_aims,
-                "context": unit.context,
-                "cefr_level": unit.cefr_level.value if hasattr(unit.cefr_level, 'value') else str(unit.cefr_level),
-                "unit_type": unit.unit_type.value if hasattr(unit.unit_type, 'value') else str(unit.unit_type),
-                "vocabulary": unit.vocabulary,
-                "sentences": unit.sentences,
-                "tips": unit.tips,
-                "grammar": unit.grammar,
-                "course_id": unit.course_id if unit.course_id else "",
-                "book_id": unit.book_id if unit.book_id else ""
-            }
+            unit_raw_data = _unit_prompt_data(unit)
             
             # Usar prompt generator com dados crus
             prompt = await self.prompt_generator.generate_professor_solving_prompt(
@@ -699,17 +979,13 @@ class SolveAssessmentsService:
             
         except Exception as e:
             logger.error(f"Erro ao gerar prompt simplificado: {e}")
-            return f"""
-            CORRECTION TASK:
-            - Assessment Type: {assessment_type}
-            - Unit: {unit.title if hasattr(unit, 'title') else 'Unknown'}
-            - Level: {unit.cefr_level}
-            
-            Raw Assessment Data: {json.dumps(target_assessment, indent=2)}
-            Student Answers: {json.dumps(student_answers or {}, indent=2)}
-            
-            Please provide structured correction with scores, feedback, and analysis.
-            """
+            return _format_simplified_correction_fallback_prompt(
+                assessment_type=assessment_type,
+                unit_title=unit.title if hasattr(unit, 'title') else 'Unknown',
+                cefr_level=unit.cefr_level,
+                assessment_data=json_dumps_pretty(target_assessment),
+                student_answers=json_dumps_pretty(student_answers or {})
+            )
 
     def get_service_status(self) -> Dict[str, Any]:
         """Status do serviço de correção."""
@@ -740,7 +1016,9 @@ class SolveAssessmentsService:
         unit: Any, 
         assessment_type: str,
         include_explanations: bool = True,
-        difficulty_analysis: bool = True
+        difficulty_analysis: bool = True,
+        solve_mode: str = "stream",
+        batch_timeout: float = GABARITO_BATCH_INTERACTIVE_TIMEOUT
     ) -> AssessmentSolution:
         """
         Gerar gabarito completo para um assessment específico.
@@ -750,50 +1028,80 @@ class SolveAssessmentsService:
             assessment_type: Tipo do assessment 
             include_explanations: Incluir explicações detalhadas
             difficulty_analysis: Incluir análise de dificuldade
+            solve_mode: "stream" (interativo) ou "batch" (Batch API; aguarda a
+                        conclusão do batch)
+            batch_timeout: Espera máxima em segundos no modo batch (obrigatoriamente
+                           limitada; TimeoutError se o batch não terminar a tempo)
             
         Returns:
             AssessmentSolution: Gabarito estruturado completo
         """
-        start_time = time.time()
+        if solve_mode not in GABARITO_SOLVE_MODES:
+            raise ValueError(
+                f"solve_mode deve ser um de: {sorted(GABARITO_SOLVE_MODES)}"
+            )
+        if solve_mode == "batch" and not (batch_timeout and batch_timeout > 0):
+            raise ValueError(
+                "batch_timeout deve ser positivo; "
+                "para esperas longas use collect_batch_gabaritos"
+            )
+
+        start_time = time.perf_counter()
         logger.info(f"🎯 Gerando gabarito para {assessment_type} via GPT-5")
         
+        # 1. Extrair assessment específico (também compõe a chave de cache)
+        target_assessment = self._extract_target_assessment(
+            unit.assessments, assessment_type
+        )
+
+        cache_key = self._response_cache_key(
+            "gabarito", unit, target_assessment, assessment_type,
+            include_explanations, difficulty_analysis
+        )
+        cached_result = self._get_cached_response(cache_key, update={
+            "solution_timestamp": datetime.now(timezone.utc),
+            "processing_time": time.perf_counter() - start_time
+        })
+        if cached_result is not None:
+            logger.info(f"📦 Gabarito de {assessment_type} reutilizado do cache")
+            return cached_result
+
         try:
-            # 1. Extrair assessment específico
-            target_assessment = self._extract_target_assessment(unit.assessments, assessment_type)
-            
-            # 2. Preparar contexto hierárquico
-            hierarchy_context = {
-                "course_name": getattr(unit, 'course_name', 'Unknown Course'),
-                "book_name": getattr(unit, 'book_name', 'Unknown Book')
-            }
+            # 2-3. Contexto hierárquico + prompt via PromptGeneratorService
+            # (fallback se o YAML falhar)
+            messages = await self._build_gabarito_messages(
+                unit, target_assessment, assessment_type
+            )
             
-            # 3. Gerar prompt usando o PromptGeneratorService
-            try:
-                messages = await self.prompt_generator.generate_gabarito_prompt(
-                    unit_data=unit.__dict__,
-                    assessment_data=target_assessment,
-                    assessment_type=assessment_type,
-                    hierarchy_context=hierarchy_context
+            # 4. Gerar gabarito via GPT-5 com structured output (chave de cache por
+            # unidade: gabaritos da mesma unidade compartilham o prefixo do prompt)
+            if solve_mode == "batch":
+                logger.info("📦 Gerando gabarito via Batch API...")
+                custom_id = f"{unit.id}:{assessment_type}"
+                gabarito_result = (await self._generate_with_batch_api(
+                    [{"custom_id": custom_id, "messages": messages}],
+                    timeout=batch_timeout
+                ))[0]
+                if isinstance(gabarito_result, Exception):
+                    raise gabarito_result
+            else:
+                logger.info("🤖 Gerando gabarito via GPT-5 com structured output...")
+                gabarito_result = await self._generate_with_structured_output(
+                    messages, prompt_cache_key=f"unit:{unit.id}"
                 )
-            except Exception as prompt_error:
-                logger.error(f"Erro ao gerar prompt de gabarito: {prompt_error}")
-                # Usar fallback direto
-                messages = self._generate_gabarito_prompt_fallback(unit, target_assessment, assessment_type)
-            
-            # 4. Gerar gabarito via GPT-5 com structured output
-            logger.info("🤖 Gerando gabarito via GPT-5 com structured output...")
-            gabarito_result = await self._generate_with_structured_output(messages)
             
             # 5. Processar resultado
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             
             # Adicionar metadados
-            gabarito_result['solution_timestamp'] = datetime.now().isoformat()
-            gabarito_result['ai_model_used'] = 'gpt-4'
+            gabarito_result['solution_timestamp'] = datetime.now(timezone.utc)
+            gabarito_result['ai_model_used'] = self.llm_config.get("model")
             gabarito_result['processing_time'] = processing_time
             
             # Validar com Pydantic
-            result = AssessmentSolution(**gabarito_result)
+            # (ou montar direto quando o structured output é confiável)
+            result = self._build_gabarito_solution(gabarito_result)
+            self._save_cached_response(cache_key, result)
             
             logger.info(f"✅ Gabarito gerado em {processing_time:.2f}s - {result.total_items} items resolvidos")
             return result
@@ -802,40 +1110,432 @@ class SolveAssessmentsService:
             logger.error(f"❌ Erro na geração de gabarito: {str(e)}")
             raise
 
-    def _generate_gabarito_prompt_fallback(self, unit: Any, assessment_data: Dict[str, Any], assessment_type: str) -> List[Any]:
-        """Fallback para geração de prompt se o YAML falhar."""
-        from langchain.schema import SystemMessage, HumanMessage
+    async def generate_all_gabaritos(
+        self,
+        unit: Any,
+        assessment_types: List[str],
+        include_explanations: bool = True,
+        difficulty_analysis: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Gerar gabaritos de vários assessments da unidade em paralelo
+        (concorrência limitada).
         
-        system_prompt = """You are an expert English teacher creating answer keys for assessments. 
-        Generate complete solutions with detailed explanations for each item.
+        Args:
+            unit: Objeto Unit completo do banco
+            assessment_types: Tipos de assessment a resolver
+            include_explanations: Incluir explicações detalhadas
+            difficulty_analysis: Incluir análise de dificuldade
+
+        Returns:
+            Dict[str, Any]: assessment_type -> AssessmentSolution, ou a exceção da
+            geração que falhou
+        """
+        async def bounded_generate(assessment_type: str) -> AssessmentSolution:
+            async with self._gabarito_semaphore:
+                return await self.generate_gabarito(
+                    unit, assessment_type, include_explanations, difficulty_analysis
+                )
         
-        CRITICAL: Each item MUST include:
-        - item_id: unique identifier (string)
-        - question_text: the complete question
-        - correct_answer: the accurate solution
-        - explanation: detailed pedagogical explanation
-        - difficulty_level: MUST be "easy", "medium", or "hard" (REQUIRED)
-        - skills_tested: array of skills being evaluated
+        logger.info(f"🎯 Gerando {len(assessment_types)} gabaritos em paralelo")
+        results = await asyncio.gather(
+            *(bounded_generate(assessment_type)
+              for assessment_type in assessment_types),
+            return_exceptions=True
+        )
+
+        failed = sum(1 for result in results if isinstance(result, Exception))
+        if failed:
+            logger.warning(f"⚠️ {failed}/{len(assessment_types)} gabaritos falharam")
+
+        return dict(zip(assessment_types, results))
+
+    # =========================================================================
+    # BATCH API (geração offline em massa)
+    # =========================================================================
+
+    @property
+    def _openai_client(self) -> AsyncOpenAI:
+        """Cliente OpenAI direto (Files/Batches), criado no primeiro uso do batch."""
+        client = self._openai_client_instance
+        if client is None or client.is_closed():
+            client = AsyncOpenAI(
+                api_key=self.llm_config.get("api_key"),
+                http_client=get_llm_http_client()
+            )
+            self._openai_client_instance = client
+        return client
+
+    def _build_gabarito_batch_body(self, messages: List[Any]) -> Dict[str, Any]:
+        """Corpo de /v1/chat/completions equivalente ao structured output ao vivo."""
+        body: Dict[str, Any] = {
+            "model": self.llm_config["model"],
+            "messages": [
+                {
+                    "role": _OPENAI_MESSAGE_ROLES.get(message.type, "user"),
+                    "content": message.content
+                }
+                for message in messages
+            ],
+            "response_format": GABARITO_RESPONSE_FORMAT
+        }
+        if "temperature" in self.llm_config:
+            body["temperature"] = self.llm_config["temperature"]
+        # ChatOpenAI converte max_tokens em max_completion_tokens
+        # (gpt-5/o-series rejeitam max_tokens)
+        if self.llm_config.get("max_tokens"):
+            body["max_completion_tokens"] = self.llm_config["max_tokens"]
+        return body
+
+    def _build_gabarito_batch_line(
+        self,
+        custom_id: str,
+        messages: List[Any]
+    ) -> bytes:
+        """Linha JSONL de entrada do batch para um gabarito."""
+        return json_dumps_bytes({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": GABARITO_BATCH_ENDPOINT,
+            "body": self._build_gabarito_batch_body(messages)
+        })
+
+    async def _submit_gabarito_batch(self, lines: List[bytes]) -> Tuple[Any, str]:
+        """Enviar o JSONL pela Files API e criar o batch (batch, input_file_id)."""
+        input_file = await self._openai_client.files.create(
+            file=("gabaritos_batch.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        batch = await self._openai_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=GABARITO_BATCH_ENDPOINT,
+            completion_window=GABARITO_BATCH_COMPLETION_WINDOW,
+            metadata={"source": "ivo_gabaritos"}
+        )
+        logger.info(
+            f"📦 Batch de {len(lines)} gabaritos enfileirado: "
+            f"{batch.id} ({batch.status})"
+        )
+        return batch, input_file.id
+
+    async def _wait_for_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = GABARITO_BATCH_MIN_POLL_INTERVAL,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Consultar o batch até um status terminal (polling com backoff até o teto)."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        batch = await self._openai_client.batches.retrieve(batch_id)
+        while batch.status not in GABARITO_BATCH_TERMINAL_STATUSES:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Batch {batch_id} ainda em '{batch.status}' após {timeout}s"
+                )
+            logger.debug(
+                f"⏳ Batch {batch_id}: {batch.status} "
+                f"(próxima consulta em {poll_interval:.0f}s)"
+            )
+            # Última espera não ultrapassa o deadline
+            sleep_for = poll_interval
+            if deadline is not None:
+                sleep_for = max(0.0, min(poll_interval, deadline - time.monotonic()))
+            await asyncio.sleep(sleep_for)
+            poll_interval = min(poll_interval * 2, GABARITO_BATCH_MAX_POLL_INTERVAL)
+            batch = await self._openai_client.batches.retrieve(batch_id)
+
+        if batch.status != "completed":
+            # Cancelado/expirado ainda entrega os itens concluídos no arquivo de saída
+            if not batch.output_file_id:
+                raise RuntimeError(
+                    f"Batch {batch_id} terminou com status '{batch.status}'"
+                )
+            logger.warning(
+                f"⚠️ Batch {batch_id} terminou com status '{batch.status}': "
+                f"resultados parciais"
+            )
+        return batch
+
+    async def _read_batch_results(self, batch: Any) -> Dict[str, Any]:
+        """
+        Baixar saída e erros do batch.
+
+        Returns:
+            Dict[str, Any]: custom_id -> gabarito_result (dict) ou exceção do item
+        """
+        results: Dict[str, Any] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self._openai_client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    record = json_loads(line)
+                    custom_id = record["custom_id"]
+                    results[custom_id] = self._parse_batch_gabarito_record(record)
+        return results
+
+    def _parse_batch_gabarito_record(self, record: Dict[str, Any]) -> Any:
+        """Extrair o gabarito_result de uma linha do batch (ou a exceção do item)."""
+        try:
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                error = record.get("error") or response.get("body")
+                raise RuntimeError(f"Item do batch falhou: {error}")
+
+            message = response["body"]["choices"][0]["message"]
+            if message.get("refusal"):
+                raise RuntimeError(f"Modelo recusou o gabarito: {message['refusal']}")
+            return json_loads(message["content"])
+        except Exception as e:
+            logger.error(
+                f"❌ Erro no gabarito do batch {record.get('custom_id')}: {str(e)}"
+            )
+            return e
+
+    async def _cancel_batch(self, batch_id: str) -> None:
+        """Cancelar batch abandonado (best effort: falha só é logada)."""
+        try:
+            await self._openai_client.batches.cancel(batch_id)
+            logger.warning(f"🛑 Batch {batch_id} cancelado")
+        except Exception as e:
+            logger.error(f"❌ Erro ao cancelar batch {batch_id}: {str(e)}")
+
+    async def _delete_batch_input_file(self, input_file_id: str) -> None:
+        """Remover o JSONL de entrada do batch (best effort: falha só é logada)."""
+        try:
+            await self._openai_client.files.delete(input_file_id)
+        except Exception as e:
+            logger.error(
+                f"❌ Erro ao remover arquivo de entrada {input_file_id}: {str(e)}"
+            )
+
+    async def _generate_with_batch_api(
+        self,
+        jobs: List[Dict[str, Any]],
+        timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Gerar gabaritos pela Batch API: envia, aguarda (polling com backoff)
+        e devolve os resultados.
+
+        Args:
+            jobs: Dicts com custom_id e messages (prompt LangChain)
+            timeout: Tempo máximo de espera em segundos
+                (None = até a janela do batch expirar)
+
+        Returns:
+            List[Any]: gabarito_result (dict) por job, na ordem de entrada,
+                ou a exceção do item
+        """
+        lines = [
+            self._build_gabarito_batch_line(job["custom_id"], job["messages"])
+            for job in jobs
+        ]
+        batch, input_file_id = await self._submit_gabarito_batch(lines)
+        try:
+            batch = await self._wait_for_batch(batch.id, timeout=timeout)
+            results = await self._read_batch_results(batch)
+        except TimeoutError as e:
+            # Batch não coletado continuaria rodando (e sendo cobrado)
+            # até a janela de 24h
+            await self._cancel_batch(batch.id)
+            raise TimeoutError(
+                f"Batch {batch.id} não terminou em {timeout}s e foi cancelado; "
+                f"itens já concluídos podem ser obtidos com "
+                f"collect_batch_gabaritos('{batch.id}')"
+            ) from e
+        except asyncio.CancelledError:
+            await self._cancel_batch(batch.id)
+            raise
+        finally:
+            await self._delete_batch_input_file(input_file_id)
+
+        return [
+            results.get(job["custom_id"])
+            or RuntimeError(f"Item {job['custom_id']} ausente na saída do batch")
+            for job in jobs
+        ]
+
+    async def queue_batch_gabaritos(
+        self,
+        jobs: List[Tuple[Any, str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Enfileirar gabaritos na Batch API da OpenAI
+        (janela de 24h, ~50% do custo por token).
+
+        Indicado para fluxos offline (ex.: todos os assessments de um book
+        durante a noite); o resultado é coletado depois com collect_batch_gabaritos.
+
+        Args:
+            jobs: Tuplas (unit, assessment_type, assessment_data); assessment_data vazio
+                  é extraído de unit.assessments
+
+        Returns:
+            Dict[str, Any]: batch_id, status, input_file_id e custom_ids
+                ("<unit_id>:<assessment_type>")
+        """
+        if not jobs:
+            raise ValueError("Nenhum gabarito para enfileirar")
+
+        lines: List[bytes] = []
+        custom_ids: List[str] = []
+        for unit, assessment_type, assessment_data in jobs:
+            target_assessment = assessment_data or self._extract_target_assessment(
+                unit.assessments, assessment_type
+            )
+            messages = await self._build_gabarito_messages(
+                unit, target_assessment, assessment_type
+            )
+
+            custom_id = f"{unit.id}:{assessment_type}"
+            custom_ids.append(custom_id)
+            lines.append(self._build_gabarito_batch_line(custom_id, messages))
+
+        batch, input_file_id = await self._submit_gabarito_batch(lines)
+
+        return {
+            "batch_id": batch.id,
+            "status": batch.status,
+            "input_file_id": input_file_id,
+            "custom_ids": custom_ids
+        }
+
+    async def collect_batch_gabaritos(
+        self,
+        batch_id: str,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Aguardar o batch terminar (polling) e reconstituir os gabaritos.
+
+        Args:
+            batch_id: ID retornado por queue_batch_gabaritos
+            poll_interval: Intervalo inicial entre consultas de status
+                (dobra até o teto)
+            timeout: Tempo máximo de espera em segundos
+                (None = até a janela do batch expirar)
+
+        Returns:
+            Dict[str, Any]: custom_id -> AssessmentSolution, ou a exceção
+                do item que falhou
         """
+        batch = await self._wait_for_batch(
+            batch_id, poll_interval=poll_interval, timeout=timeout
+        )
+        batch_results = await self._read_batch_results(batch)
         
-        user_prompt = f"""Generate a complete answer key for this {assessment_type} assessment:
+        results: Dict[str, Any] = {}
+        for custom_id, gabarito_result in batch_results.items():
+            if isinstance(gabarito_result, Exception):
+                results[custom_id] = gabarito_result
+                continue
+            try:
+                gabarito_result['solution_timestamp'] = datetime.now(timezone.utc)
+                gabarito_result['ai_model_used'] = self.llm_config.get("model")
+                gabarito_result['processing_time'] = None
+                results[custom_id] = self._build_gabarito_solution(gabarito_result)
+            except Exception as e:
+                logger.error(f"❌ Erro no gabarito do batch {custom_id}: {str(e)}")
+                results[custom_id] = e
+
+        failed = sum(1 for result in results.values() if isinstance(result, Exception))
+        logger.info(
+            f"✅ Batch {batch_id} coletado: "
+            f"{len(results) - failed}/{len(results)} gabaritos"
+        )
         
-        Unit Context: {getattr(unit, 'context', '')}
-        Assessment Data: {json.dumps(assessment_data, indent=2)}
+        return results
+
+    async def _build_gabarito_messages(
+        self,
+        unit: Any,
+        target_assessment: Dict[str, Any],
+        assessment_type: str
+    ) -> List[Any]:
+        """Montar mensagens do prompt de gabarito (YAML com fallback embutido)."""
+        hierarchy_context = {
+            "course_name": getattr(unit, 'course_name', 'Unknown Course'),
+            "book_name": getattr(unit, 'book_name', 'Unknown Book')
+        }
         
-        IMPORTANT: Every single item must have a difficulty_level field set to "easy", "medium", or "hard"."""
+        try:
+            return await self.prompt_generator.generate_gabarito_prompt(
+                unit_data=_unit_prompt_data(unit),
+                assessment_data=target_assessment,
+                assessment_type=assessment_type,
+                hierarchy_context=hierarchy_context
+            )
+        except Exception as prompt_error:
+            logger.error(f"Erro ao gerar prompt de gabarito: {prompt_error}")
+            # Usar fallback direto
+            return self._generate_gabarito_prompt_fallback(
+                unit, target_assessment, assessment_type
+            )
+
+    def _generate_gabarito_prompt_fallback(
+        self,
+        unit: Any,
+        assessment_data: Dict[str, Any],
+        assessment_type: str
+    ) -> List[Any]:
+        """Fallback para geração de prompt se o YAML falhar."""
+        user_prompt = _format_gabarito_fallback_prompt(
+            assessment_type=assessment_type,
+            unit_context=getattr(unit, 'context', ''),
+            assessment_data=json_dumps_pretty(assessment_data)
+        )
         
         return [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt)  
+            SystemMessage(content=GABARITO_FALLBACK_SYSTEM_PROMPT),
+            HumanMessage(content=user_prompt)
         ]
 
-    async def _generate_with_structured_output(self, messages: List[Any]) -> Dict[str, Any]:
-        """Gerar gabarito com structured output."""
+    async def _generate_with_structured_output(
+        self,
+        messages: List[Any],
+        prompt_cache_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Gerar gabarito com structured output, consumindo a resposta via streaming.
+
+        Cada chunk é o objeto parcial acumulado até o momento; o último é o
+        gabarito completo. prompt_cache_key agrupa no mesmo cache de prompt da
+        OpenAI as chamadas que compartilham o prefixo (enviado via extra_body,
+        compatível com qualquer versão do SDK).
+        """
         try:
-            schema = self._create_gabarito_schema()
+            invoke_kwargs = (
+                {"extra_body": {"prompt_cache_key": prompt_cache_key}}
+                if prompt_cache_key else {}
+            )
+
+            async def stream() -> Any:
+                response = None
+                completed_items = 0
+                llm = self._structured_gabarito_llm
+                async for chunk in llm.astream(messages, **invoke_kwargs):
+                    response = chunk
+                    # Um item está completo quando o seguinte começa a chegar
+                    if isinstance(chunk, dict):
+                        items_so_far = max(len(chunk.get("items") or ()) - 1, 0)
+                        if items_so_far > completed_items:
+                            completed_items = items_so_far
+                            logger.debug(
+                                f"📥 Gabarito em streaming: "
+                                f"{completed_items} items completos"
+                            )
+                return response
+
+            # Stream refeito do início em erro transitório
+            # (chunks parciais são descartados)
+            response = await self._with_transient_retry(stream)
+
+            if not isinstance(response, dict):
+                raise ValueError("Structured output não retornou um objeto de gabarito")
             
-            response = await self.llm.with_structured_output(schema).ainvoke(messages)
             logger.info("✅ Gabarito GPT-5 gerado com structured output")
             
             return response
@@ -0,0 +1,68 @@
+# tests/test_construct_recursive.py
+"""
+Testes do caminho sem validação (_construct_recursive) usado com IVO_TRUSTED_LLM_OUTPUT.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from src.core.unit_models import AssessmentItem, AssessmentSolution
+from src.services.solve_assessments import _construct_recursive
+
+SOLUTION = {
+    "assessment_type": "gap_fill",
+    "assessment_title": "Hotel Vocabulary",
+    "total_items": 2,
+    "instructions": "Fill in the gaps.",
+    "unit_context": "Hotel check-in",
+    "items": [
+        {
+            "item_id": "1",
+            "question_text": "I'd like to ___ in, please.",
+            "correct_answer": "check",
+            "explanation": "Phrasal verb 'check in'.",
+            "difficulty_level": "easy",
+            "skills_tested": ["vocabulary"],
+        },
+        {
+            "item_id": "2",
+            "question_text": "Could you ___ me a taxi?",
+            "correct_answer": "call",
+            "explanation": "'Call a taxi' collocation.",
+            "difficulty_level": "medium",
+        },
+    ],
+    "skills_overview": ["vocabulary"],
+    "difficulty_distribution": {"easy": 1, "medium": 1},
+    # default_factory geraria valores diferentes nos dois caminhos
+    "solution_timestamp": datetime(2026, 1, 1, 12, 0, 0),
+}
+
+
+class SolutionEnvelope(BaseModel):
+    solution: Optional[AssessmentSolution] = None
+    alternatives: Optional[List[AssessmentItem]] = None
+    note: Optional[str] = None
+
+
+def test_matches_validated_assessment_solution():
+    constructed = _construct_recursive(AssessmentSolution, SOLUTION)
+    validated = AssessmentSolution.model_validate(SOLUTION)
+
+    assert all(isinstance(item, AssessmentItem) for item in constructed.items)
+    assert constructed.model_dump() == validated.model_dump()
+
+
+def test_optional_nested_models_and_missing_optional_field():
+    data = {"solution": SOLUTION, "alternatives": [SOLUTION["items"][0]]}
+
+    constructed = _construct_recursive(SolutionEnvelope, data)
+    validated = SolutionEnvelope.model_validate(data)
+
+    assert isinstance(constructed.solution, AssessmentSolution)
+    assert isinstance(constructed.solution.items[0], AssessmentItem)
+    assert isinstance(constructed.alternatives[0], AssessmentItem)
+    assert constructed.note is None
+    assert constructed.model_dump() == validated.model_dump()
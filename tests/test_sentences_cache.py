@@ -0,0 +1,108 @@
+# tests/test_sentences_cache.py
+"""
+Testes do cache em memória (LRU + TTL + heap de expiração) do SentencesGeneratorService.
+"""
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import sentences_generator
+from src.services.sentences_generator import SentencesGeneratorService
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio controlado para o módulo (time.time usado pelo cache)."""
+    now = {"value": 1000.0}
+    monkeypatch.setattr(
+        sentences_generator, "time", SimpleNamespace(time=lambda: now["value"])
+    )
+    return now
+
+
+def make_service(max_cache_size: int = 3, ttl: float = 100.0):
+    """Serviço só com o estado do cache (sem LLM/config)."""
+    service = SentencesGeneratorService.__new__(SentencesGeneratorService)
+    service._memory_cache = OrderedDict()
+    service._cache_expiry = {}
+    service._expiry_heap = []
+    service._max_cache_size = max_cache_size
+    service._cache_ttl = ttl
+    return service
+
+
+def test_hit_moves_entry_to_most_recent(clock):
+    service = make_service(max_cache_size=3)
+    for key in ("a", "b", "c"):
+        service._save_to_cache_with_ttl(key, {"key": key})
+
+    assert service._get_from_cache_with_ttl("a") == {"key": "a"}
+    service._save_to_cache_with_ttl("d", {"key": "d"})
+
+    # "b" virou o menos recente depois do hit em "a"
+    assert list(service._memory_cache) == ["c", "a", "d"]
+
+
+def test_expired_entry_evicted_before_least_recent(clock):
+    service = make_service(max_cache_size=3, ttl=100.0)
+    service._save_to_cache_with_ttl("a", {"key": "a"})
+    clock["value"] += 50
+    service._save_to_cache_with_ttl("b", {"key": "b"})
+    service._save_to_cache_with_ttl("c", {"key": "c"})
+    service._get_from_cache_with_ttl("a")  # "a" passa a ser o mais recente
+
+    clock["value"] += 51  # só "a" expirou
+    service._save_to_cache_with_ttl("d", {"key": "d"})
+
+    assert list(service._memory_cache) == ["b", "c", "d"]
+    assert "a" not in service._cache_expiry
+
+
+def test_bulk_expiry_rebuilds_dicts_preserving_lru_order(clock):
+    service = make_service(max_cache_size=4, ttl=100.0)
+    for key in ("a", "b", "c"):
+        service._save_to_cache_with_ttl(key, {"key": key})
+    clock["value"] += 50
+    service._save_to_cache_with_ttl("d", {"key": "d"})
+
+    clock["value"] += 51  # a, b, c expirados: lote grande
+    service._save_to_cache_with_ttl("e", {"key": "e"})
+
+    assert isinstance(service._memory_cache, OrderedDict)
+    assert list(service._memory_cache) == ["d", "e"]
+    assert set(service._cache_expiry) == {"d", "e"}
+
+
+def test_heap_compacted_while_cache_stays_under_limit(clock):
+    service = make_service(max_cache_size=3)
+    for _ in range(50):
+        clock["value"] += 1
+        service._save_to_cache_with_ttl("a", {"key": "a"})
+
+    assert len(service._memory_cache) == 1
+    assert len(service._expiry_heap) <= 4 * service._max_cache_size
+
+
+def test_resaving_same_key(clock):
+    service = make_service(max_cache_size=8, ttl=100.0)
+    service._save_to_cache_with_ttl("a", {"sentences": [{"text": "first"}]})
+    # Mesmo tick: duas entradas idênticas no heap
+    data = {"sentences": [{"text": "second"}]}
+    service._save_to_cache_with_ttl("a", data)
+
+    # Última gravação vence; cópias isoladas do chamador e entre hits
+    data["sentences"].append({"text": "mutated"})
+    hit = service._get_from_cache_with_ttl("a")
+    assert hit == {"sentences": [{"text": "second"}]}
+    hit["sentences"].clear()
+    assert service._get_from_cache_with_ttl("a") == {"sentences": [{"text": "second"}]}
+
+    # Duas entradas idênticas no heap expiram juntas sem KeyError na limpeza
+    clock["value"] += 101
+    for key in "bcdefghi":
+        service._save_to_cache_with_ttl(key, {"key": key})
+
+    assert "a" not in service._memory_cache
+    assert len(service._memory_cache) == 8
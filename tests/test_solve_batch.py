@@ -0,0 +1,241 @@
+# tests/test_solve_batch.py
+"""
+Testes do formato de fio da Batch API nos gabaritos (sem chamadas à OpenAI).
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.services.solve_assessments import (
+    GABARITO_BATCH_ENDPOINT,
+    GABARITO_RESPONSE_FORMAT,
+    SolveAssessmentsService,
+)
+
+LLM_CONFIG = {"model": "gpt-5", "temperature": 0.7, "max_tokens": 15000}
+
+GABARITO = {
+    "assessment_type": "gap_fill",
+    "assessment_title": "Hotel Vocabulary",
+    "total_items": 1,
+    "instructions": "Fill in the gaps.",
+    "unit_context": "Hotel check-in",
+    "items": [
+        {
+            "item_id": "1",
+            "question_text": "I'd like to ___ in, please.",
+            "correct_answer": "check",
+            "explanation": "Phrasal verb 'check in'.",
+            "difficulty_level": "easy",
+            "skills_tested": ["vocabulary"],
+        }
+    ],
+}
+
+
+def output_line(custom_id, message, status_code=200):
+    """Linha do arquivo de saída do batch."""
+    return {
+        "id": f"batch_req_{custom_id}",
+        "custom_id": custom_id,
+        "response": {
+            "status_code": status_code,
+            "request_id": "req_1",
+            "body": {
+                "model": "gpt-5",
+                "choices": [{"index": 0, "message": message}],
+            },
+        },
+        "error": None,
+    }
+
+
+def success_line(custom_id):
+    return output_line(
+        custom_id,
+        {"role": "assistant", "content": json.dumps(GABARITO), "refusal": None},
+    )
+
+
+def refusal_line(custom_id):
+    return output_line(
+        custom_id,
+        {"role": "assistant", "content": None, "refusal": "I can't help with that."},
+    )
+
+
+def server_error_line(custom_id):
+    line = output_line(custom_id, {})
+    line["response"] = {
+        "status_code": 500,
+        "request_id": "req_2",
+        "body": {"error": {"message": "Internal error", "type": "server_error"}},
+    }
+    return line
+
+
+def error_file_line(custom_id):
+    """Linha do arquivo de erros (request rejeitado antes da execução)."""
+    return {
+        "id": f"batch_req_{custom_id}",
+        "custom_id": custom_id,
+        "response": None,
+        "error": {"code": "invalid_request", "message": "Unsupported parameter"},
+    }
+
+
+def to_jsonl(lines):
+    return "\n".join(json.dumps(line) for line in lines) + "\n"
+
+
+class FakeFiles:
+    def __init__(self, contents):
+        self.contents = contents
+        self.uploaded = None
+        self.deleted = []
+
+    async def create(self, file, purpose):
+        self.uploaded = (file, purpose)
+        return SimpleNamespace(id="file-input")
+
+    async def content(self, file_id):
+        return SimpleNamespace(text=self.contents[file_id])
+
+    async def delete(self, file_id):
+        self.deleted.append(file_id)
+
+
+class FakeBatches:
+    def __init__(self, final_status="completed"):
+        self.final_status = final_status
+        self.created = None
+        self.cancelled = []
+
+    async def create(self, **kwargs):
+        self.created = kwargs
+        return SimpleNamespace(id="batch_1", status="validating")
+
+    async def retrieve(self, batch_id):
+        return SimpleNamespace(
+            id=batch_id,
+            status=self.final_status,
+            output_file_id="file-output",
+            error_file_id="file-errors",
+        )
+
+    async def cancel(self, batch_id):
+        self.cancelled.append(batch_id)
+
+
+class FakeOpenAI:
+    def __init__(self, contents, final_status="completed"):
+        self.files = FakeFiles(contents)
+        self.batches = FakeBatches(final_status)
+
+    def is_closed(self):
+        return False
+
+
+def make_service(client=None):
+    """Serviço só com o necessário para o modo batch (sem LLM/prompt generator)."""
+    service = SolveAssessmentsService.__new__(SolveAssessmentsService)
+    service.llm_config = dict(LLM_CONFIG)
+    service._openai_client_instance = client
+    return service
+
+
+MESSAGES = [SystemMessage(content="system"), HumanMessage(content="user")]
+
+
+def test_batch_body_matches_live_structured_output_request():
+    body = make_service()._build_gabarito_batch_body(MESSAGES)
+
+    assert body["response_format"] == GABARITO_RESPONSE_FORMAT
+    assert body["response_format"]["type"] == "json_schema"
+    assert body["max_completion_tokens"] == 15000
+    assert "max_tokens" not in body
+    assert "tools" not in body
+    assert body["messages"] == [
+        {"role": "system", "content": "system"},
+        {"role": "user", "content": "user"},
+    ]
+
+
+def test_parse_success_record():
+    result = make_service()._parse_batch_gabarito_record(success_line("u1:gap_fill"))
+
+    assert result == GABARITO
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        refusal_line("u1:gap_fill"),
+        server_error_line("u1:gap_fill"),
+        error_file_line("u1:gap_fill"),
+    ],
+    ids=["refusal", "non_200", "error_file"],
+)
+def test_parse_failed_records_return_exception(record):
+    result = make_service()._parse_batch_gabarito_record(record)
+
+    assert isinstance(result, RuntimeError)
+
+
+async def test_read_batch_results_merges_output_and_error_files():
+    client = FakeOpenAI({
+        "file-output": to_jsonl([success_line("u1:gap_fill"), refusal_line("u1:mc")]),
+        "file-errors": to_jsonl([error_file_line("u1:cloze_test")]),
+    })
+    service = make_service(client)
+    batch = await client.batches.retrieve("batch_1")
+
+    results = await service._read_batch_results(batch)
+
+    assert results["u1:gap_fill"] == GABARITO
+    assert isinstance(results["u1:mc"], RuntimeError)
+    assert isinstance(results["u1:cloze_test"], RuntimeError)
+
+
+async def test_generate_with_batch_api_orders_results_and_flags_missing_ids():
+    client = FakeOpenAI({
+        "file-output": to_jsonl([success_line("u1:gap_fill")]),
+        "file-errors": "",
+    })
+    service = make_service(client)
+    jobs = [
+        {"custom_id": "u1:gap_fill", "messages": MESSAGES},
+        {"custom_id": "u1:missing", "messages": MESSAGES},
+    ]
+
+    results = await service._generate_with_batch_api(jobs, timeout=60)
+
+    assert results[0] == GABARITO
+    assert isinstance(results[1], RuntimeError)
+    assert "u1:missing" in str(results[1])
+
+    # Entrada enviada: uma linha por job, corpo com o formato do caminho ao vivo
+    (filename, payload), purpose = client.files.uploaded
+    assert purpose == "batch"
+    lines = [json.loads(line) for line in payload.decode("utf-8").splitlines()]
+    assert [line["custom_id"] for line in lines] == ["u1:gap_fill", "u1:missing"]
+    assert all(line["url"] == GABARITO_BATCH_ENDPOINT for line in lines)
+    assert all("max_completion_tokens" in line["body"] for line in lines)
+    assert client.batches.created["endpoint"] == GABARITO_BATCH_ENDPOINT
+    assert client.files.deleted == ["file-input"]
+
+
+async def test_generate_with_batch_api_cancels_on_timeout():
+    client = FakeOpenAI({}, final_status="in_progress")
+    service = make_service(client)
+
+    with pytest.raises(TimeoutError, match="batch_1"):
+        await service._generate_with_batch_api(
+            [{"custom_id": "u1:gap_fill", "messages": MESSAGES}], timeout=0
+        )
+
+    assert client.batches.cancelled == ["batch_1"]
+    assert client.files.deleted == ["file-input"]